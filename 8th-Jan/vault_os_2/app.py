@@ -16,6 +16,9 @@ from typing import Optional
 
 from .core.security import SecurityManager, PasswordGenerator
 from .core.database import VaultDatabase
+from .core.rekey import RekeyEngine
+from .core.audit import VaultAuditor
+from .core import breach
 from .ui.components import VaultConsole, ConfirmationModal
 from .ui.themes import THEMES, CYBER_DARK, ICONS, ASCII_LOGO
 from .ui.screens import DashboardScreen, CredentialsScreen
@@ -44,6 +47,8 @@ class VaultOS:
         # Load settings
         lock_timeout = int(self.db.get_setting('lock_timeout', '300'))
         self.security.set_lock_timeout(lock_timeout)
+        flush_interval = float(self.db.get_setting('access_flush_interval', '30'))
+        self.db.set_access_flush_interval(flush_interval)
         
         # Set lock callback
         self.security.set_lock_callback(self._on_vault_locked)
@@ -52,7 +57,8 @@ class VaultOS:
         self.dashboard = DashboardScreen(self.console, self.db, self.security)
         self.credentials_screen = CredentialsScreen(self.console, self.db, self.security)
         self.generator_screen = PasswordGeneratorScreen(self.console, self.security)
-        self.audit_screen = SecurityAuditScreen(self.console, self.db, self.security)
+        self.audit_screen = SecurityAuditScreen(self.console, self.db, self.security,
+                                                self.data_dir / breach.INDEX_FILENAME)
         self.settings_screen = SettingsScreen(self.console, self.db, self.security)
         
         # Handle graceful shutdown
@@ -67,6 +73,7 @@ class VaultOS:
     
     def _on_vault_locked(self):
         """Callback when vault auto-locks."""
+        self.db.flush_access_log()
         self.console.show_lock_screen()
         self.console.print(f"\n[{self.console.theme.warning}]Vault locked due to inactivity[/]")
         self._unlock_vault()
@@ -79,12 +86,36 @@ class VaultOS:
             if not self._authenticate():
                 return
             
+            # Finish an encryption key rotation that was interrupted
+            self._resume_rekey()
+            
+            # Fingerprint passwords saved by older versions, for reuse warnings
+            VaultAuditor(self.db, self.security).fill_fingerprints()
+            
+            # Keep the activity log bounded (at most once a day)
+            self.db.run_log_retention()
+            
+            # Shrink ciphertexts stored by older versions, off the UI thread
+            self.db.start_ciphertext_conversion()
+            
             self._main_loop()
         except KeyboardInterrupt:
             pass
         finally:
             self._shutdown()
     
+    def _resume_rekey(self):
+        """Complete a pending key rotation before the vault is used."""
+        engine = RekeyEngine(self.db, self.security)
+        state = self.db.get_rekey_state()
+        if state is None:
+            return
+        
+        self.console.show_warning("Finishing an interrupted encryption key rotation...")
+        with self.console.progress_bar("Re-encrypting credentials", state['total']) as update:
+            engine.resume(progress=update)
+        self.console.show_success("Encryption key rotation completed.")
+    
     def _show_startup(self):
         """Show startup animation."""
         self.console.clear()
@@ -203,6 +234,7 @@ class VaultOS:
                 self.settings_screen.render()
             elif action == '6':
                 self.security.lock_vault()
+                self.db.flush_access_log()
                 if not self._unlock_vault():
                     break
             elif action == 'q':
@@ -212,6 +244,7 @@ class VaultOS:
     def _credentials_flow(self):
         """Handle credentials browsing flow."""
         search_query = None
+        self.credentials_screen.reset_pagination()
         
         while True:
             result = self.credentials_screen.list_credentials(search_query)
@@ -226,7 +259,11 @@ class VaultOS:
                 if action == 'search':
                     search_query = data
                 elif action == 'view':
-                    view_result = self.credentials_screen.view_credential(data)
+                    # List rows are lazy; load the password and notes now
+                    credential = self.db.get_credential(data.id)
+                    if credential is None:
+                        continue
+                    view_result = self.credentials_screen.view_credential(credential)
                     
                     if isinstance(view_result, tuple):
                         sub_action, cred = view_result
@@ -258,6 +295,7 @@ class VaultOS:
         self.console.print()
         
         self.security.lock_vault()
+        self.db.flush_access_log()
         self.db.close()
 
 
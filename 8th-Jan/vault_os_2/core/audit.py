@@ -0,0 +1,262 @@
+"""
+╔═══════════════════════════════════════════════════════════════════════════════╗
+║                           AUDIT MODULE                                        ║
+║              Incremental, Streaming Security Audit                            ║
+╚═══════════════════════════════════════════════════════════════════════════════╝
+
+The audit is a pipeline of generators, one page of credentials at a time:
+
+    paged read -> decrypt + analyse (stale rows only) -> aggregate
+
+Per-credential results (strength score, rating, issues, breach hit) are
+kept in the audit_cache table, tagged with the credential's last_updated.
+Only credentials whose tag no longer matches (new, edited or imported rows)
+are decrypted and analysed; the rest come straight from the cache, so a
+repeat audit does no decryption at all. Each page's results are saved as
+it goes, so a cancelled audit keeps the work it finished.
+
+The report is updated after every page. It keeps counts plus a few
+examples of each finding, so memory does not grow with the vault.
+
+The whole cache is dropped when its context changes: the analyzer version
+or the installed breach list. Password age is computed from last_updated
+when the report is built, so it never goes stale. Reused passwords come
+from the keyed fingerprints stored with each credential, grouped in SQL;
+missing fingerprints are filled page by page along with the analysis.
+"""
+
+import heapq
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from itertools import count
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .breach import BreachIndex
+from .database import VaultDatabase
+from .security import SecurityManager, PasswordGenerator
+from .strength import RATINGS
+
+
+# Bump when scoring changes so cached results are recomputed
+AUDIT_VERSION = 1
+
+WEAK_SCORE = 40
+MAX_AGE = timedelta(days=90)
+
+# Examples kept per finding; counts are always exact
+MAX_EXAMPLES = 10
+
+
+@dataclass
+class AuditReport:
+    """
+    Audit findings so far. The counts cover every credential checked; the
+    example lists hold the weakest, oldest or first-found few.
+    """
+    total: int = 0       # credentials in the vault
+    checked: int = 0     # credentials aggregated so far
+    analysed: int = 0    # of those, decrypted and analysed this run
+    unreadable: int = 0  # could not be decrypted
+    weak_count: int = 0
+    old_count: int = 0
+    breached_count: int = 0
+    reused_count: int = 0  # credentials sharing a password with another
+    breached_passwords: List[Dict[str, Any]] = field(default_factory=list)
+    reused_passwords: List[List[str]] = field(default_factory=list)
+    breach_index_size: int = 0  # 0 when no breach list is installed
+    strength_distribution: Dict[str, int] = field(
+        default_factory=lambda: {rating: 0 for rating in reversed(RATINGS)}
+    )
+    complete: bool = False
+    _weakest: List[tuple] = field(default_factory=list, repr=False)
+    _oldest: List[tuple] = field(default_factory=list, repr=False)
+    _order: Iterator[int] = field(default_factory=count, repr=False)
+
+    def _keep(self, heap: List[tuple], rank: Any, item: Dict[str, Any]):
+        """Keep the MAX_EXAMPLES items of highest rank."""
+        entry = (rank, -next(self._order), item)  # Ties: first found wins
+        if len(heap) < MAX_EXAMPLES:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+
+    @property
+    def weak_passwords(self) -> List[Dict[str, Any]]:
+        """Weakest first."""
+        return [item for *_, item in sorted(self._weakest, key=lambda e: e[:2], reverse=True)]
+
+    @property
+    def old_passwords(self) -> List[Dict[str, Any]]:
+        """Oldest first."""
+        return [item for *_, item in sorted(self._oldest, key=lambda e: e[:2], reverse=True)]
+
+    def add(self, row: Dict[str, Any], now: datetime):
+        """Aggregate one credential's result."""
+        self.checked += 1
+        self.strength_distribution[row['rating']] += 1
+
+        if row['score'] < WEAK_SCORE:
+            self.weak_count += 1
+            self._keep(self._weakest, -row['score'], {
+                'website': row['website'],
+                'username': row['username'],
+                'score': row['score'],
+                'rating': row['rating']
+            })
+        if row['breached']:
+            self.breached_count += 1
+            if len(self.breached_passwords) < MAX_EXAMPLES:
+                self.breached_passwords.append({'website': row['website'], 'username': row['username']})
+
+        try:
+            last_updated = datetime.fromisoformat(row['last_updated'].replace('Z', '+00:00'))
+        except ValueError:
+            return
+        age = (datetime.now(last_updated.tzinfo) if last_updated.tzinfo else now) - last_updated
+        if age > MAX_AGE:
+            self.old_count += 1
+            self._keep(self._oldest, age, {'website': row['website'], 'age_days': age.days})
+
+
+class VaultAuditor:
+    """Runs the security audit, re-analysing only what changed."""
+
+    BATCH_SIZE = 500
+
+    def __init__(self, db: VaultDatabase, security: SecurityManager,
+                 breach_index_path: Optional[Path] = None, batch_size: int = BATCH_SIZE):
+        self.db = db
+        self.security = security
+        self.breach_index_path = breach_index_path
+        self.batch_size = batch_size
+
+    def _open_breach_index(self) -> Optional[BreachIndex]:
+        if self.breach_index_path is None:
+            return None
+        try:
+            return BreachIndex.open_if_exists(self.breach_index_path)
+        except (OSError, ValueError):
+            return None  # Unreadable list: audit without it
+
+    def _context(self, breach_index: Optional[BreachIndex]) -> str:
+        breach_stamp = 'none'
+        if breach_index is not None:
+            stat = breach_index.path.stat()
+            breach_stamp = f"{len(breach_index)}:{stat.st_mtime_ns}"
+        return f"v{AUDIT_VERSION}:{breach_stamp}"
+
+    def fill_fingerprints(self) -> int:
+        """
+        Compute missing password fingerprints (rows written by older versions
+        or left unreadable by a key rotation). Returns how many were filled.
+        """
+        filled = 0
+        last_id = 0
+        while True:
+            rows = self.db.get_unfingerprinted_credentials(last_id, self.batch_size)
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            passwords = self.security.decrypt_many(
+                (ciphertext for _, ciphertext in rows), strict=False
+            )
+            fingerprints = [(cred_id, self.security.fingerprint(password))
+                            for (cred_id, _), password in zip(rows, passwords)
+                            if password is not None]
+            self.db.set_password_fingerprints(fingerprints)
+            filled += len(fingerprints)
+        return filled
+
+    def _pages(self) -> Iterator[List[Dict[str, Any]]]:
+        """Stage 1: credentials with their cached results, a page at a time."""
+        last_id = 0
+        while True:
+            rows = self.db.get_audit_page(last_id, self.batch_size)
+            if not rows:
+                return
+            last_id = rows[-1]['id']
+            yield [dict(row) for row in rows]
+
+    def _analysed(self, pages: Iterator[List[Dict[str, Any]]],
+                  breach_index: Optional[BreachIndex]) -> Iterator[Tuple[List[Dict[str, Any]], int, int, int]]:
+        """
+        Stage 2: decrypt the stale rows of each page and those missing a
+        password fingerprint, analyse the stale ones and save results and
+        fingerprints. Yields (rows that have a result, analysed count,
+        unreadable count, fingerprints filled). Unreadable rows get no
+        result and are retried next time.
+        """
+        for rows in pages:
+            todo = [row for row in rows if not row['cached'] or row['needs_fingerprint']]
+            passwords = self.security.decrypt_many(
+                (row['encrypted_password'] for row in todo), strict=False
+            )
+            decrypted = [(row, password) for row, password in zip(todo, passwords) if password is not None]
+            fingerprints = [(row['id'], self.security.fingerprint(password))
+                            for row, password in decrypted if row['needs_fingerprint']]
+            self.db.set_password_fingerprints(fingerprints)
+
+            stale = [row for row in todo if not row['cached']]
+            readable = [(row, password) for row, password in decrypted if not row['cached']]
+            strength = PasswordGenerator.analyze_many(password for _, password in readable)
+            breached = (breach_index.contains_many(password for _, password in readable)
+                        if breach_index is not None else [False] * len(readable))
+
+            for i, (row, _) in enumerate(readable):
+                row.update(score=strength.scores[i], rating=strength.rating(i),
+                           issues=strength.issues[i], breached=int(breached[i]), cached=True)
+            self.db.save_audit_results([
+                (row['id'], row['last_updated'], row['score'], row['rating'], row['issues'], row['breached'])
+                for row, _ in readable
+            ])
+            yield ([row for row in rows if row['cached']], len(readable), len(stale) - len(readable),
+                   len(fingerprints))
+
+    def audit(self, cancel: Optional[threading.Event] = None) -> Iterator[AuditReport]:
+        """
+        Stage 3: aggregate. Yields the same report after every page, then
+        once more with complete=True. Stops after the current page, leaving
+        complete=False, once `cancel` is set. Reuse needs no decryption, so
+        it is filled in from the start, and counted again at the end if the
+        audit had to fill in fingerprints.
+        """
+        breach_index = self._open_breach_index()
+        try:
+            self.db.validate_audit_cache(self._context(breach_index))
+            report = AuditReport(
+                total=self.db.get_credential_count(),
+                breach_index_size=len(breach_index) if breach_index is not None else 0
+            )
+            self._count_reuse(report)
+            filled = 0
+            now = datetime.now()
+            for rows, analysed, unreadable, fingerprinted in self._analysed(self._pages(), breach_index):
+                report.analysed += analysed
+                report.unreadable += unreadable
+                filled += fingerprinted
+                for row in rows:
+                    report.add(row, now)
+                yield report
+                if cancel is not None and cancel.is_set():
+                    return
+        finally:
+            if breach_index is not None:
+                breach_index.close()
+
+        if filled:
+            self._count_reuse(report)
+        report.complete = True
+        yield report
+
+    def _count_reuse(self, report: AuditReport):
+        report.reused_count = self.db.count_reused_passwords()
+        report.reused_passwords = self.db.get_reused_password_groups(limit=MAX_EXAMPLES)
+
+    def run(self) -> AuditReport:
+        """Run the whole audit and return the final report."""
+        report = None
+        for report in self.audit():
+            pass
+        return report
@@ -0,0 +1,236 @@
+"""
+╔═══════════════════════════════════════════════════════════════════════════════╗
+║                           BACKUP MODULE                                       ║
+║              Framed, Streaming Encrypted Export Format                        ║
+╚═══════════════════════════════════════════════════════════════════════════════╝
+
+An export is written and read one chunk of records at a time, so memory use
+does not depend on the size of the vault:
+
+    MAGIC
+    u32 length + header JSON   (format, version, kdf, salt, chunk_size)
+    u32 length + frame         (repeated)
+
+Each frame is a Fernet token (stored as raw bytes) over
+
+    u64 frame index + u8 kind + payload
+
+where kind is RECORDS (a JSON list of records) or END (a JSON trailer with
+the record count and a SHA-256 of the header). Fernet authenticates every
+frame; the index stops frames being reordered or spliced between exports,
+and the trailer detects truncation and a swapped header. The END frame must
+be the last thing in the stream.
+"""
+
+import base64
+import hashlib
+import json
+import struct
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from .kdf import KDFParams
+
+
+MAGIC = b'VAULTOS\x03'
+FORMAT = 'vault-os-export'
+VERSION = 3
+DEFAULT_CHUNK_SIZE = 1000
+
+# Refuse absurd lengths from corrupt files before allocating for them
+MAX_HEADER_SIZE = 64 * 1024
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+_LENGTH = struct.Struct('>I')
+_FRAME_PREFIX = struct.Struct('>QB')
+
+RECORDS = 0
+END = 1
+
+
+class BackupError(ValueError):
+    """The export is corrupt, truncated or was not written with this password."""
+
+
+@dataclass
+class BackupHeader:
+    """Unencrypted export header: everything needed to derive the key."""
+    params: KDFParams
+    salt: bytes
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+
+    def to_bytes(self) -> bytes:
+        return json.dumps({
+            'format': FORMAT,
+            'version': VERSION,
+            'kdf': self.params.to_dict(),
+            'salt': base64.urlsafe_b64encode(self.salt).decode(),
+            'chunk_size': self.chunk_size,
+        }, sort_keys=True).encode()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'BackupHeader':
+        try:
+            header = json.loads(data)
+        except ValueError as e:
+            raise BackupError("Corrupt export header") from e
+        if not isinstance(header, dict) or header.get('format') != FORMAT or header.get('version') != VERSION:
+            raise BackupError("Unsupported export format")
+        try:
+            return cls(
+                params=KDFParams.from_dict(header['kdf']),
+                salt=base64.urlsafe_b64decode(header['salt']),
+                chunk_size=int(header['chunk_size']),
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise BackupError("Corrupt export header") from e
+
+
+def is_framed(prefix: bytes) -> bool:
+    """Whether data starting with `prefix` is a framed export."""
+    return prefix[:len(MAGIC)] == MAGIC
+
+
+def _read_exact(source: BinaryIO, size: int) -> Optional[bytes]:
+    """Read exactly `size` bytes; None at a clean end of stream."""
+    data = source.read(size)
+    if not data:
+        return None
+    while len(data) < size:
+        more = source.read(size - len(data))
+        if not more:
+            raise BackupError("Export is truncated")
+        data += more
+    return data
+
+
+def _read_block(source: BinaryIO, limit: int) -> Optional[bytes]:
+    prefix = _read_exact(source, _LENGTH.size)
+    if prefix is None:
+        return None
+    (length,) = _LENGTH.unpack(prefix)
+    if length > limit:
+        raise BackupError("Export is corrupt")
+    data = _read_exact(source, length)
+    if data is None:
+        raise BackupError("Export is truncated")
+    return data
+
+
+def read_header(source: BinaryIO, magic: Optional[bytes] = None) -> BackupHeader:
+    """
+    Consume and parse the magic and header of a framed export. Pass `magic`
+    if the caller already read it to detect the format.
+    """
+    if magic is None:
+        magic = source.read(len(MAGIC))
+    if not is_framed(magic):
+        raise BackupError("Not a Vault OS export")
+    data = _read_block(source, MAX_HEADER_SIZE)
+    if data is None:
+        raise BackupError("Export is truncated")
+    return BackupHeader.from_bytes(data)
+
+
+class BackupWriter:
+    """Writes records to `out` as encrypted frames of `header.chunk_size`."""
+
+    def __init__(self, out: BinaryIO, header: BackupHeader, key: bytes):
+        self.out = out
+        self.chunk_size = header.chunk_size
+        self.count = 0
+        self._fernet = Fernet(key)
+        self._index = 0
+        self._pending: List[Dict[str, Any]] = []
+
+        header_bytes = header.to_bytes()
+        self._header_digest = hashlib.sha256(header_bytes).hexdigest()
+        out.write(MAGIC)
+        self._write_block(header_bytes)
+
+    def _write_block(self, data: bytes):
+        self.out.write(_LENGTH.pack(len(data)))
+        self.out.write(data)
+
+    def _write_frame(self, kind: int, payload: bytes):
+        token = self._fernet.encrypt(_FRAME_PREFIX.pack(self._index, kind) + payload)
+        self._write_block(base64.urlsafe_b64decode(token))
+        self._index += 1
+
+    def _flush(self):
+        if self._pending:
+            self._write_frame(RECORDS, json.dumps(self._pending).encode())
+            self.count += len(self._pending)
+            self._pending = []
+
+    def write(self, record: Dict[str, Any]):
+        self._pending.append(record)
+        if len(self._pending) >= self.chunk_size:
+            self._flush()
+
+    def close(self) -> int:
+        """Write the remaining records and the trailer. Returns the record count."""
+        self._flush()
+        self._write_frame(END, json.dumps({
+            'count': self.count,
+            'header_sha256': self._header_digest,
+        }).encode())
+        self.out.flush()
+        return self.count
+
+
+class BackupReader:
+    """
+    Iterates the record chunks of a framed export whose header has already
+    been read. Raises BackupError for a wrong password or damaged file;
+    chunks yielded before the error were authentic.
+    """
+
+    def __init__(self, source: BinaryIO, header: BackupHeader, key: bytes):
+        self.source = source
+        self.count = 0
+        self._fernet = Fernet(key)
+        self._header_digest = hashlib.sha256(header.to_bytes()).hexdigest()
+
+    def _decrypt(self, frame: bytes, index: int) -> tuple:
+        try:
+            plaintext = self._fernet.decrypt(base64.urlsafe_b64encode(frame))
+        except InvalidToken:
+            if index == 0:
+                raise BackupError("Wrong password or corrupt export")
+            raise BackupError("Export is corrupt")
+        frame_index, kind = _FRAME_PREFIX.unpack_from(plaintext)
+        if frame_index != index:
+            raise BackupError("Export frames are out of order")
+        return kind, plaintext[_FRAME_PREFIX.size:]
+
+    def chunks(self) -> Iterator[List[Dict[str, Any]]]:
+        index = 0
+        while True:
+            frame = _read_block(self.source, MAX_FRAME_SIZE)
+            if frame is None:
+                raise BackupError("Export is truncated")
+            kind, payload = self._decrypt(frame, index)
+            index += 1
+
+            if kind == RECORDS:
+                records = json.loads(payload)
+                self.count += len(records)
+                yield records
+            elif kind == END:
+                trailer = json.loads(payload)
+                if trailer.get('header_sha256') != self._header_digest:
+                    raise BackupError("Export header does not match its contents")
+                if trailer.get('count') != self.count:
+                    raise BackupError("Export is truncated")
+                if self.source.read(1):
+                    raise BackupError("Unexpected data after the end of the export")
+                return
+            else:
+                raise BackupError("Export is corrupt")
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for records in self.chunks():
+            yield from records
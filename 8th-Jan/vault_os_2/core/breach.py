@@ -0,0 +1,239 @@
+"""
+╔═══════════════════════════════════════════════════════════════════════════════╗
+║                           BREACH MODULE                                       ║
+║              Offline Breached-Password Index                                  ║
+╚═══════════════════════════════════════════════════════════════════════════════╝
+
+Checks passwords against a local list of known-breached passwords without
+any network access.
+
+The index is built once, offline, from a plaintext word list (one password
+per line) or a Have I Been Pwned "SHA-1 ordered by hash" download (lines of
+HASH:COUNT). It stores the first 8 bytes of each password's SHA-1 as sorted,
+deduplicated little-endian u64 values, behind a fan-out table giving where
+each value of the top 16 bits starts:
+
+    MAGIC | u64 count | u64 fanout[65537] | count x u64 prefix
+
+Lookups load the 512 KiB fan-out table, memory-map the rest and
+binary-search one bucket, which usually sits in a single page. Resident
+memory grows by at most a page per distinct lookup however large the list.
+With 64-bit prefixes a false positive needs a 1 in 2**64 / n collision.
+
+Building sorts bounded runs in memory and merges them from temporary
+files, so memory stays flat however long the source list is.
+"""
+
+import bisect
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Optional, Union
+
+
+MAGIC = b'VOSBRCH1'
+INDEX_FILENAME = 'breached.idx'
+
+_HEADER = struct.Struct('<8sQ')
+_PREFIX_SIZE = 8
+_FANOUT_BITS = 16
+_FANOUT_SHIFT = 64 - _FANOUT_BITS
+_FANOUT_ENTRIES = (1 << _FANOUT_BITS) + 1
+_DATA_OFFSET = _HEADER.size + _FANOUT_ENTRIES * _PREFIX_SIZE
+
+# Prefixes sorted in memory per run while building (8 bytes each)
+RUN_SIZE = 2_000_000
+
+
+def password_prefix(password: str) -> int:
+    """First 64 bits of the password's SHA-1, as an integer."""
+    digest = hashlib.sha1(password.encode('utf-8', 'surrogatepass')).digest()
+    return int.from_bytes(digest[:_PREFIX_SIZE], 'big')
+
+
+def _parse_line(line: bytes) -> Optional[int]:
+    """Prefix for one source line: a HIBP 'HASH:COUNT' line or a plain password."""
+    line = line.rstrip(b'\r\n')
+    if not line:
+        return None
+    head, sep, count = line.partition(b':')
+    if sep and len(head) == 40 and count.strip().isdigit():
+        try:
+            return int(head[:2 * _PREFIX_SIZE], 16)
+        except ValueError:
+            pass
+    return password_prefix(line.decode('utf-8', 'replace'))
+
+
+def _write_u64(values: array, out: BinaryIO):
+    if sys.byteorder == 'big':
+        values.byteswap()  # The file is little-endian throughout
+    values.tofile(out)
+
+
+def _read_u64(data: bytes) -> array:
+    values = array('Q', data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def _write_run(prefixes: array, directory: str) -> str:
+    fd, path = tempfile.mkstemp(prefix='breach-run-', dir=directory)
+    with os.fdopen(fd, 'wb') as out:
+        _write_u64(array('Q', sorted(prefixes)), out)
+    return path
+
+
+def _read_run(path: str) -> Iterator[int]:
+    with open(path, 'rb') as source:
+        while True:
+            block = source.read(_PREFIX_SIZE * 8192)
+            if not block:
+                return
+            yield from _read_u64(block)
+
+
+def build_index(sources: Iterable[Union[str, Path]], output: Union[str, Path],
+                run_size: int = RUN_SIZE,
+                progress: Optional[Callable[[int], None]] = None) -> int:
+    """
+    Build an index at `output` from word-list or HIBP files. `progress` is
+    called with the number of lines read after each run. Returns the number
+    of distinct entries.
+    """
+    output = Path(output)
+    directory = str(output.parent)
+    tmp_output = output.with_name(output.name + '.tmp')
+    runs: List[str] = []
+    pending = array('Q')
+    lines = 0
+    try:
+        for source in sources:
+            with open(source, 'rb') as lines_in:
+                for line in lines_in:
+                    prefix = _parse_line(line)
+                    if prefix is None:
+                        continue
+                    pending.append(prefix)
+                    lines += 1
+                    if len(pending) >= run_size:
+                        runs.append(_write_run(pending, directory))
+                        pending = array('Q')
+                        if progress:
+                            progress(lines)
+        if pending:
+            runs.append(_write_run(pending, directory))
+        pending = None
+
+        bucket_sizes = array('Q', bytes(_PREFIX_SIZE * _FANOUT_ENTRIES))
+        count = 0
+        with open(tmp_output, 'wb') as out:
+            out.seek(_DATA_OFFSET)  # Header and fan-out are written last
+            previous = None
+            buffer = array('Q')
+            for prefix in heapq.merge(*(_read_run(path) for path in runs)):
+                if prefix != previous:
+                    buffer.append(prefix)
+                    bucket_sizes[(prefix >> _FANOUT_SHIFT) + 1] += 1
+                    previous = prefix
+                    if len(buffer) >= 65536:
+                        count += len(buffer)
+                        _write_u64(buffer, out)
+                        buffer = array('Q')
+            count += len(buffer)
+            _write_u64(buffer, out)
+
+            for bucket in range(1, _FANOUT_ENTRIES):
+                bucket_sizes[bucket] += bucket_sizes[bucket - 1]
+            out.seek(0)
+            out.write(_HEADER.pack(MAGIC, count))
+            _write_u64(bucket_sizes, out)
+        os.replace(tmp_output, output)
+        if progress:
+            progress(lines)
+        return count
+    finally:
+        for path in runs:
+            os.unlink(path)
+        if tmp_output.exists():
+            tmp_output.unlink()
+
+
+class BreachIndex:
+    """A memory-mapped breached-password index; use as a context manager."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._map: Optional[mmap.mmap] = None
+        self._prefixes = None
+        with open(self.path, 'rb') as index_file:
+            header = index_file.read(_DATA_OFFSET)
+            if len(header) < _DATA_OFFSET or header[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{self.path} is not a breached-password index")
+            _, self._count = _HEADER.unpack_from(header)
+            if os.fstat(index_file.fileno()).st_size != _DATA_OFFSET + self._count * _PREFIX_SIZE:
+                raise ValueError(f"{self.path} is truncated")
+            self._fanout = _read_u64(header[_HEADER.size:])
+            if self._count:
+                self._map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+                if hasattr(self._map, 'madvise'):
+                    # Lookups jump around: fault in single pages, no readahead
+                    self._map.madvise(mmap.MADV_RANDOM)
+                if sys.byteorder == 'little':
+                    # Bisect the mapped prefixes directly, in C
+                    self._prefixes = memoryview(self._map)[_DATA_OFFSET:].cast('Q')
+
+    @classmethod
+    def open_if_exists(cls, path: Union[str, Path]) -> Optional['BreachIndex']:
+        """The index at `path`, or None if none has been built."""
+        return cls(path) if Path(path).is_file() else None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _contains_prefix(self, prefix: int) -> bool:
+        bucket = prefix >> _FANOUT_SHIFT
+        lo, hi = self._fanout[bucket], self._fanout[bucket + 1]
+        if self._prefixes is not None:
+            position = bisect.bisect_left(self._prefixes, prefix, lo, hi)
+            return position < hi and self._prefixes[position] == prefix
+        data = self._map
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = _DATA_OFFSET + mid * _PREFIX_SIZE
+            value = int.from_bytes(data[offset:offset + _PREFIX_SIZE], 'little')
+            if value < prefix:
+                lo = mid + 1
+            elif value > prefix:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def __contains__(self, password: str) -> bool:
+        return bool(self._count) and self._contains_prefix(password_prefix(password))
+
+    def contains_many(self, passwords: Iterable[str]) -> List[bool]:
+        """Breached flags for many passwords, in input order."""
+        return [password in self for password in passwords]
+
+    def close(self):
+        if self._prefixes is not None:
+            self._prefixes.release()
+            self._prefixes = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def __enter__(self) -> 'BreachIndex':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -5,33 +5,99 @@
 ╚═══════════════════════════════════════════════════════════════════════════════╝
 """
 
+import re
+import sys
+import zlib
 import sqlite3
+import threading
 from pathlib import Path
-from datetime import datetime
-from typing import List, Optional, Dict, Any
-from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from contextlib import contextmanager
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Tuple, Union, BinaryIO
+from dataclasses import dataclass, asdict, field
 import json
 
+from .migrations import migrate
+from .security import is_legacy_ciphertext, upgrade_legacy_ciphertext
 
-@dataclass
+
+# Slotted records (no per-instance __dict__) where the interpreter supports it
+_RECORD_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_RECORD_OPTIONS)
 class Credential:
-    """Represents a stored credential."""
+    """
+    Represents a stored credential.
+    Rows loaded with lazy=True leave encrypted_password and notes as None;
+    fetch the full record with VaultDatabase.get_credential().
+    password_fingerprint (SecurityManager.fingerprint()) is only written:
+    set it together with a new encrypted_password. Queries do not load it.
+    """
     id: Optional[int]
     website: str
     username: str
-    encrypted_password: str
-    notes: str
+    encrypted_password: Optional[Union[bytes, str]]  # str: legacy text format
+    notes: Optional[str]
     category: str
     created_at: str
     last_updated: str
     last_accessed: Optional[str]
     access_count: int
+    password_fingerprint: Optional[bytes] = None
     
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
 
 
-@dataclass 
+@dataclass
+class ConnectionProfile:
+    """
+    SQLite tuning applied to every vault connection.
+    Each field can be overridden from the settings table with a 'db.' key
+    (e.g. 'db.journal_mode'), or by passing a profile to VaultDatabase.
+    """
+    journal_mode: str = 'WAL'           # Readers no longer block the writer
+    synchronous: str = 'NORMAL'         # Safe with WAL, no fsync per commit
+    mmap_size: int = 64 * 1024 * 1024   # Memory-mapped reads (bytes)
+    cache_size: int = -16000            # Page cache; negative means KiB
+    temp_store: str = 'MEMORY'          # Sorts and temp indexes in RAM
+    
+    _CHOICES = {
+        'journal_mode': ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'),
+        'synchronous': ('OFF', 'NORMAL', 'FULL', 'EXTRA'),
+        'temp_store': ('DEFAULT', 'FILE', 'MEMORY'),
+    }
+    
+    @classmethod
+    def from_settings(cls, settings: Dict[str, str]) -> 'ConnectionProfile':
+        """Build a profile from 'db.*' settings, ignoring invalid values."""
+        profile = cls()
+        for name, default in asdict(profile).items():
+            value = settings.get(f'db.{name}')
+            if value is None:
+                continue
+            if isinstance(default, int):
+                try:
+                    setattr(profile, name, int(value))
+                except ValueError:
+                    continue
+            elif value.upper() in cls._CHOICES[name]:
+                setattr(profile, name, value.upper())
+        return profile
+    
+    def apply(self, conn: sqlite3.Connection):
+        """Apply the pragmas to an open connection."""
+        for name, choices in self._CHOICES.items():
+            value = getattr(self, name).upper()
+            if value not in choices:
+                raise ValueError(f"Invalid {name}: {value}")
+            conn.execute(f'PRAGMA {name} = {value}')
+        conn.execute(f'PRAGMA mmap_size = {int(self.mmap_size)}')
+        conn.execute(f'PRAGMA cache_size = {int(self.cache_size)}')
+
+
+@dataclass(**_RECORD_OPTIONS)
 class ActivityLog:
     """Represents an activity log entry."""
     id: Optional[int]
@@ -41,12 +107,155 @@ class ActivityLog:
     timestamp: str
 
 
+@dataclass
+class ImportReport:
+    """Outcome of an import, per entry."""
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0  # Already in the vault, with on_conflict='skip'
+    failed: List[Tuple[str, str]] = field(default_factory=list)  # (entry, reason)
+    
+    @property
+    def imported(self) -> int:
+        return self.inserted + self.updated
+    
+    def summary(self) -> str:
+        return (f"{self.inserted} added, {self.updated} updated, "
+                f"{self.skipped} skipped, {len(self.failed)} failed")
+
+
+# Column order matches the Credential / ActivityLog field order, so rows can
+# be passed positionally to the constructors by the cursor row factories.
+CREDENTIAL_COLUMNS = (
+    'id', 'website', 'username', 'encrypted_password', 'notes', 'category',
+    'created_at', 'last_updated', 'last_accessed', 'access_count'
+)
+LAZY_COLUMNS = ('encrypted_password', 'notes')
+ACTIVITY_LOG_COLUMNS = ('id', 'action', 'target', 'details', 'timestamp')
+
+
+def _credential_columns(alias: str = '', lazy: bool = False) -> str:
+    """SELECT list for Credential rows; lazy rows skip the heavy columns."""
+    prefix = f'{alias}.' if alias else ''
+    return ', '.join(
+        'NULL' if lazy and name in LAZY_COLUMNS else prefix + name
+        for name in CREDENTIAL_COLUMNS
+    )
+
+
+def _credential_row(cursor: sqlite3.Cursor, row: tuple) -> Credential:
+    """Cursor row factory building Credential objects straight from tuples."""
+    return Credential(*row)
+
+
+def _activity_log_row(cursor: sqlite3.Cursor, row: tuple) -> ActivityLog:
+    """Cursor row factory building ActivityLog objects straight from tuples."""
+    return ActivityLog(*row)
+
+
+class AccessTracker:
+    """
+    Buffers credential access events in memory and writes them with one
+    executemany, so reading a credential never waits on a disk write.
+    A daemon thread flushes every `flush_interval` seconds; the app also
+    flushes on lock and shutdown.
+    """
+    
+    DEFAULT_FLUSH_INTERVAL = 30.0
+    
+    def __init__(self, db: 'VaultDatabase', flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self._db = db
+        self.flush_interval = flush_interval
+        self._pending: Dict[int, list] = {}  # id -> [count, last_accessed]
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def record(self, credential_id: int):
+        """Record one access to a credential."""
+        now = datetime.now().isoformat()
+        with self._lock:
+            entry = self._pending.setdefault(credential_id, [0, None])
+            entry[0] += 1
+            entry[1] = now
+        
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+    
+    def pending(self, credential_id: int) -> Tuple[int, Optional[str]]:
+        """Unflushed (access count, last accessed) for a credential."""
+        with self._lock:
+            count, last_accessed = self._pending.get(credential_id, (0, None))
+        return count, last_accessed
+    
+    def pending_counts(self) -> Dict[int, int]:
+        """Unflushed access counts by credential id."""
+        with self._lock:
+            return {credential_id: count for credential_id, (count, _) in self._pending.items()}
+    
+    def flush(self) -> int:
+        """
+        Write buffered access events. Returns the number of credentials
+        updated. If the write fails the events go back into the buffer,
+        ahead of any recorded meanwhile, and the error is raised.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        
+        rows = [(last_accessed, count, credential_id)
+                for credential_id, (count, last_accessed) in pending.items()]
+        try:
+            with self._db.batch() as conn:
+                conn.executemany('''
+                    UPDATE credentials 
+                    SET last_accessed = ?, access_count = access_count + ? 
+                    WHERE id = ?
+                ''', rows)
+        except sqlite3.Error:
+            with self._lock:
+                for credential_id, (count, last_accessed) in pending.items():
+                    entry = self._pending.setdefault(credential_id, [0, last_accessed])
+                    entry[0] += count
+            raise
+        return len(rows)
+    
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error:
+                continue  # Events were put back; retry next round, never kill the thread
+    
+    def stop(self):
+        """Stop the background thread and write what is left."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+
 class VaultDatabase:
     """SQLite database manager for the password vault."""
     
-    def __init__(self, db_path: Path):
+    DEFAULT_LOG_MAX_ROWS = 10000
+    DEFAULT_LOG_RETENTION_DAYS = 90
+    
+    def __init__(self, db_path: Path, profile: Optional[ConnectionProfile] = None,
+                 access_flush_interval: float = AccessTracker.DEFAULT_FLUSH_INTERVAL):
         self.db_path = db_path
+        self.profile = profile
         self._connection: Optional[sqlite3.Connection] = None
+        self._batch_depth = 0
+        self._write_lock = threading.RLock()
+        self._fts_enabled: Optional[bool] = None
+        self._access_tracker = AccessTracker(self, access_flush_interval)
+        self._conversion_thread: Optional[threading.Thread] = None
+        self._conversion_stop = threading.Event()
         self._initialize_database()
     
     def _get_connection(self) -> sqlite3.Connection:
@@ -55,211 +264,334 @@ class VaultDatabase:
             self.db_path.parent.mkdir(parents=True, exist_ok=True)
             self._connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
             self._connection.row_factory = sqlite3.Row
+            self._apply_profile(self._connection)
         return self._connection
     
+    def _apply_profile(self, conn: sqlite3.Connection):
+        """Apply the connection profile (constructor argument or settings table)."""
+        if self.profile is None:
+            try:
+                rows = conn.execute("SELECT key, value FROM settings WHERE key LIKE 'db.%'").fetchall()
+            except sqlite3.OperationalError:
+                rows = []  # Fresh database, settings table not created yet
+            self.profile = ConnectionProfile.from_settings({row['key']: row['value'] for row in rows})
+        self.profile.apply(conn)
+    
+    def _credential_cursor(self) -> sqlite3.Cursor:
+        """Cursor whose rows come back as Credential objects."""
+        cursor = self._get_connection().cursor()
+        cursor.row_factory = _credential_row
+        return cursor
+    
+    @contextmanager
+    def batch(self) -> Iterator[sqlite3.Connection]:
+        """
+        Group writes into a single transaction (unit of work).
+        Nested batches join the outermost one, which commits once on exit
+        or rolls everything back if the block raises. Batches from other
+        threads (e.g. the access-tracking flush) wait for it to finish.
+        """
+        with self._write_lock:
+            conn = self._get_connection()
+            if self._batch_depth == 0 and not conn.in_transaction:
+                conn.execute('BEGIN')
+            self._batch_depth += 1
+            try:
+                yield conn
+            except BaseException:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    conn.rollback()
+                raise
+            else:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    conn.commit()
+    
     def _initialize_database(self):
-        """Create database tables if they don't exist."""
+        """Bring the schema up to date; a single pragma read when already current."""
+        migrate(self._get_connection())
+    
+    @property
+    def fts_enabled(self) -> bool:
+        """Whether the FTS5 search index exists (SQLite may lack FTS5)."""
+        if self._fts_enabled is None:
+            self._fts_enabled = self._get_connection().execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'credentials_fts'"
+            ).fetchone() is not None
+        return self._fts_enabled
+    
+    @fts_enabled.setter
+    def fts_enabled(self, enabled: bool):
+        self._fts_enabled = enabled
+    
+    def explain_query_plan(self, sql: str, params: tuple = ()) -> List[str]:
+        """Return the EXPLAIN QUERY PLAN detail lines for a statement."""
+        cursor = self._get_connection().cursor()
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row['detail'] for row in cursor.fetchall()]
+    
+    def add_credential(self, credential: Credential) -> int:
+        """Add a new credential to the vault."""
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        # Credentials table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS credentials (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                website TEXT NOT NULL,
-                username TEXT NOT NULL,
-                encrypted_password TEXT NOT NULL,
-                notes TEXT DEFAULT '',
-                category TEXT DEFAULT 'General',
-                created_at TEXT NOT NULL,
-                last_updated TEXT NOT NULL,
-                last_accessed TEXT,
-                access_count INTEGER DEFAULT 0,
-                UNIQUE(website, username)
-            )
-        ''')
+        now = datetime.now().isoformat()
         
-        # Activity logs table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS activity_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                action TEXT NOT NULL,
-                target TEXT NOT NULL,
-                details TEXT DEFAULT '',
-                timestamp TEXT NOT NULL
-            )
-        ''')
+        with self.batch():
+            cursor.execute('''
+                INSERT INTO credentials 
+                (website, username, encrypted_password, notes, category, created_at, last_updated,
+                 password_fingerprint)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                credential.website,
+                credential.username,
+                credential.encrypted_password,
+                credential.notes,
+                credential.category,
+                now,
+                now,
+                credential.password_fingerprint
+            ))
+            credential_id = cursor.lastrowid
+            
+            self._log_activity('ADD', f'{credential.website}', f'Added credential for {credential.username}')
         
-        # Settings table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS settings (
-                key TEXT PRIMARY KEY,
-                value TEXT NOT NULL
-            )
-        ''')
+        return credential_id
+    
+    def add_credentials(self, credentials: Iterable[Credential]) -> int:
+        """Add many credentials in one transaction. Returns the number added."""
+        conn = self._get_connection()
+        cursor = conn.cursor()
         
-        # Categories table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS categories (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE NOT NULL,
-                icon TEXT DEFAULT '📁',
-                color TEXT DEFAULT 'white'
-            )
-        ''')
+        now = datetime.now().isoformat()
+        rows = []
+        logs = []
+        for credential in credentials:
+            rows.append((
+                credential.website,
+                credential.username,
+                credential.encrypted_password,
+                credential.notes,
+                credential.category,
+                now,
+                now,
+                credential.password_fingerprint
+            ))
+            logs.append(('ADD', credential.website, f'Added credential for {credential.username}', now))
         
-        # Insert default categories
-        default_categories = [
-            ('General', '📁', 'white'),
-            ('Social Media', '💬', 'cyan'),
-            ('Finance', '💰', 'green'),
-            ('Work', '💼', 'blue'),
-            ('Gaming', '🎮', 'magenta'),
-            ('Shopping', '🛒', 'yellow'),
-        ]
+        if not rows:
+            return 0
         
-        cursor.executemany('''
-            INSERT OR IGNORE INTO categories (name, icon, color) VALUES (?, ?, ?)
-        ''', default_categories)
+        with self.batch():
+            cursor.executemany('''
+                INSERT INTO credentials 
+                (website, username, encrypted_password, notes, category, created_at, last_updated,
+                 password_fingerprint)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            self._log_activities(logs)
         
-        conn.commit()
+        return len(rows)
     
-    def add_credential(self, credential: Credential) -> int:
-        """Add a new credential to the vault."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+    def get_credential(self, credential_id: int) -> Optional[Credential]:
+        """
+        Get a credential by ID.
+        The access is recorded in memory and written later in a batch,
+        so this is a read-only query.
+        """
+        cursor = self._credential_cursor()
         
-        now = datetime.now().isoformat()
+        cursor.execute(f'SELECT {_credential_columns()} FROM credentials WHERE id = ?', (credential_id,))
+        credential = cursor.fetchone()
         
-        cursor.execute('''
-            INSERT INTO credentials 
-            (website, username, encrypted_password, notes, category, created_at, last_updated)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            credential.website,
-            credential.username,
-            credential.encrypted_password,
-            credential.notes,
-            credential.category,
-            now,
-            now
-        ))
+        if credential:
+            # Include accesses that have not been flushed yet
+            count, last_accessed = self._access_tracker.pending(credential_id)
+            if count:
+                credential.access_count += count
+                credential.last_accessed = last_accessed
+            self._access_tracker.record(credential_id)
+        
+        return credential
+    
+    def flush_access_log(self) -> int:
+        """Write buffered access tracking to disk."""
+        return self._access_tracker.flush()
+    
+    def set_access_flush_interval(self, seconds: float):
+        """Set how often buffered access tracking is written (takes effect next cycle)."""
+        self._access_tracker.flush_interval = max(1.0, seconds)
+    
+    def get_all_credentials(self, lazy: bool = False) -> List[Credential]:
+        """Get all credentials."""
+        cursor = self._credential_cursor()
+        cursor.execute(f'SELECT {_credential_columns(lazy=lazy)} FROM credentials ORDER BY website ASC')
+        return cursor.fetchall()
+    
+    def iter_credentials(
+        self,
+        after: Optional[Tuple[str, int]] = None,
+        limit: Optional[int] = None,
+        category: Optional[str] = None,
+        before: Optional[Tuple[str, int]] = None,
+        lazy: bool = False
+    ) -> Iterator[Credential]:
+        """
+        Iterate credentials in (website, id) order with keyset pagination.
+        Pass the (website, id) of the last row seen as `after` for the next
+        page, or of the first row seen as `before` for the previous one.
+        Each page is an index range scan, so cost does not grow with the
+        page number or vault size.
+        """
+        cursor = self._credential_cursor()
         
-        conn.commit()
-        credential_id = cursor.lastrowid
+        conditions = []
+        params: list = []
+        if category is not None:
+            conditions.append('category = ?')
+            params.append(category)
+        if after is not None:
+            conditions.append('(website, id) > (?, ?)')
+            params.extend(after)
+        if before is not None:
+            conditions.append('(website, id) < (?, ?)')
+            params.extend(before)
         
-        self._log_activity('ADD', f'{credential.website}', f'Added credential for {credential.username}')
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        # Walk backwards from `before`, then restore ascending order below
+        order = 'DESC' if before is not None and after is None else 'ASC'
+        sql = (f'SELECT {_credential_columns(lazy=lazy)} FROM credentials '
+               f'{where} ORDER BY website {order}, id {order}')
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
         
-        return credential_id
+        cursor.execute(sql, params)
+        
+        if order == 'DESC':
+            yield from reversed(cursor.fetchall())
+            return
+        
+        while True:
+            chunk = cursor.fetchmany(256)
+            if not chunk:
+                return
+            yield from chunk
     
-    def get_credential(self, credential_id: int) -> Optional[Credential]:
-        """Get a credential by ID."""
+    def search_credentials(self, query: str, lazy: bool = False) -> List[Credential]:
+        """
+        Search credentials by website, username, category or notes.
+        Uses ranked token-prefix matching through FTS5 when available,
+        otherwise a substring LIKE scan.
+        """
+        cursor = self._credential_cursor()
+        
+        # Every token must match the start of a word: "git hub" -> "git"* "hub"*
+        tokens = re.findall(r'\w+', query)
+        
+        if self.fts_enabled and tokens:
+            match = ' '.join(f'"{token}"*' for token in tokens)
+            cursor.execute(f'''
+                SELECT {_credential_columns('c', lazy)} FROM credentials_fts f
+                JOIN credentials c ON c.id = f.rowid
+                WHERE credentials_fts MATCH ?
+                ORDER BY f.rank
+            ''', (match,))
+        else:
+            search_pattern = f'%{query}%'
+            cursor.execute(f'''
+                SELECT {_credential_columns(lazy=lazy)} FROM credentials 
+                WHERE website LIKE ? OR username LIKE ? OR category LIKE ? OR notes LIKE ?
+                ORDER BY website ASC
+            ''', (search_pattern,) * 4)
+        
+        return cursor.fetchall()
+    
+    def update_credential(self, credential: Credential) -> bool:
+        """
+        Update an existing credential. The stored password fingerprint is
+        kept while the ciphertext is unchanged, and replaced by
+        credential.password_fingerprint (None: not yet computed) otherwise.
+        """
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        cursor.execute('SELECT * FROM credentials WHERE id = ?', (credential_id,))
-        row = cursor.fetchone()
+        now = datetime.now().isoformat()
         
-        if row:
-            # Update access tracking
-            now = datetime.now().isoformat()
+        with self.batch():
             cursor.execute('''
                 UPDATE credentials 
-                SET last_accessed = ?, access_count = access_count + 1 
+                SET website = ?, username = ?, encrypted_password = ?, 
+                    notes = ?, category = ?, last_updated = ?,
+                    password_fingerprint = CASE WHEN encrypted_password = ?
+                        THEN password_fingerprint ELSE ? END
                 WHERE id = ?
-            ''', (now, credential_id))
-            conn.commit()
+            ''', (
+                credential.website,
+                credential.username,
+                credential.encrypted_password,
+                credential.notes,
+                credential.category,
+                now,
+                credential.encrypted_password,
+                credential.password_fingerprint,
+                credential.id
+            ))
             
-            return Credential(
-                id=row['id'],
-                website=row['website'],
-                username=row['username'],
-                encrypted_password=row['encrypted_password'],
-                notes=row['notes'],
-                category=row['category'],
-                created_at=row['created_at'],
-                last_updated=row['last_updated'],
-                last_accessed=row['last_accessed'],
-                access_count=row['access_count']
-            )
-        return None
-    
-    def get_all_credentials(self) -> List[Credential]:
-        """Get all credentials."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM credentials ORDER BY website ASC')
-        rows = cursor.fetchall()
-        
-        return [Credential(
-            id=row['id'],
-            website=row['website'],
-            username=row['username'],
-            encrypted_password=row['encrypted_password'],
-            notes=row['notes'],
-            category=row['category'],
-            created_at=row['created_at'],
-            last_updated=row['last_updated'],
-            last_accessed=row['last_accessed'],
-            access_count=row['access_count']
-        ) for row in rows]
-    
-    def search_credentials(self, query: str) -> List[Credential]:
-        """Search credentials by website or username."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        search_pattern = f'%{query}%'
-        cursor.execute('''
-            SELECT * FROM credentials 
-            WHERE website LIKE ? OR username LIKE ? OR category LIKE ?
-            ORDER BY website ASC
-        ''', (search_pattern, search_pattern, search_pattern))
-        
-        rows = cursor.fetchall()
-        
-        return [Credential(
-            id=row['id'],
-            website=row['website'],
-            username=row['username'],
-            encrypted_password=row['encrypted_password'],
-            notes=row['notes'],
-            category=row['category'],
-            created_at=row['created_at'],
-            last_updated=row['last_updated'],
-            last_accessed=row['last_accessed'],
-            access_count=row['access_count']
-        ) for row in rows]
+            if cursor.rowcount > 0:
+                self._log_activity('EDIT', f'{credential.website}', f'Updated credential for {credential.username}')
+                return True
+        return False
     
-    def update_credential(self, credential: Credential) -> bool:
-        """Update an existing credential."""
+    def update_credentials(self, credentials: Iterable[Credential]) -> int:
+        """
+        Update many credentials in one transaction, with the same password
+        fingerprint handling as update_credential(). As there, only rows
+        that exist are logged. Returns the number updated.
+        """
         conn = self._get_connection()
         cursor = conn.cursor()
         
         now = datetime.now().isoformat()
+        rows = []
+        credentials = list(credentials)
+        for credential in credentials:
+            rows.append((
+                credential.website,
+                credential.username,
+                credential.encrypted_password,
+                credential.notes,
+                credential.category,
+                now,
+                credential.encrypted_password,
+                credential.password_fingerprint,
+                credential.id
+            ))
         
-        cursor.execute('''
-            UPDATE credentials 
-            SET website = ?, username = ?, encrypted_password = ?, 
-                notes = ?, category = ?, last_updated = ?
-            WHERE id = ?
-        ''', (
-            credential.website,
-            credential.username,
-            credential.encrypted_password,
-            credential.notes,
-            credential.category,
-            now,
-            credential.id
-        ))
+        if not rows:
+            return 0
         
-        conn.commit()
+        with self.batch():
+            cursor.execute('''
+                SELECT id FROM credentials WHERE id IN (SELECT value FROM json_each(?))
+            ''', (json.dumps([credential.id for credential in credentials]),))
+            existing = {row['id'] for row in cursor.fetchall()}
+            logs = [('EDIT', credential.website, f'Updated credential for {credential.username}', now)
+                    for credential in credentials if credential.id in existing]
+            cursor.executemany('''
+                UPDATE credentials 
+                SET website = ?, username = ?, encrypted_password = ?, 
+                    notes = ?, category = ?, last_updated = ?,
+                    password_fingerprint = CASE WHEN encrypted_password = ?
+                        THEN password_fingerprint ELSE ? END
+                WHERE id = ?
+            ''', rows)
+            updated = cursor.rowcount
+            self._log_activities(logs)
         
-        if cursor.rowcount > 0:
-            self._log_activity('EDIT', f'{credential.website}', f'Updated credential for {credential.username}')
-            return True
-        return False
+        return updated
     
     def delete_credential(self, credential_id: int) -> bool:
         """Delete a credential by ID."""
@@ -271,62 +603,33 @@ class VaultDatabase:
         row = cursor.fetchone()
         
         if row:
-            cursor.execute('DELETE FROM credentials WHERE id = ?', (credential_id,))
-            conn.commit()
-            self._log_activity('DELETE', row['website'], f'Deleted credential for {row["username"]}')
+            with self.batch():
+                cursor.execute('DELETE FROM credentials WHERE id = ?', (credential_id,))
+                self._log_activity('DELETE', row['website'], f'Deleted credential for {row["username"]}')
             return True
         return False
     
     def get_credential_count(self) -> int:
-        """Get total number of stored credentials."""
+        """Get total number of stored credentials (from the trigger-kept counters)."""
         conn = self._get_connection()
         cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM credentials')
+        cursor.execute('SELECT COALESCE(SUM(count), 0) FROM category_counts')
         return cursor.fetchone()[0]
     
     def get_last_modified_credential(self) -> Optional[Credential]:
         """Get the most recently modified credential."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM credentials ORDER BY last_updated DESC LIMIT 1')
-        row = cursor.fetchone()
-        
-        if row:
-            return Credential(
-                id=row['id'],
-                website=row['website'],
-                username=row['username'],
-                encrypted_password=row['encrypted_password'],
-                notes=row['notes'],
-                category=row['category'],
-                created_at=row['created_at'],
-                last_updated=row['last_updated'],
-                last_accessed=row['last_accessed'],
-                access_count=row['access_count']
-            )
-        return None
+        cursor = self._credential_cursor()
+        cursor.execute(f'SELECT {_credential_columns()} FROM credentials ORDER BY last_updated DESC LIMIT 1')
+        return cursor.fetchone()
     
-    def get_credentials_by_category(self, category: str) -> List[Credential]:
+    def get_credentials_by_category(self, category: str, lazy: bool = False) -> List[Credential]:
         """Get credentials filtered by category."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM credentials WHERE category = ? ORDER BY website ASC', (category,))
-        rows = cursor.fetchall()
-        
-        return [Credential(
-            id=row['id'],
-            website=row['website'],
-            username=row['username'],
-            encrypted_password=row['encrypted_password'],
-            notes=row['notes'],
-            category=row['category'],
-            created_at=row['created_at'],
-            last_updated=row['last_updated'],
-            last_accessed=row['last_accessed'],
-            access_count=row['access_count']
-        ) for row in rows]
+        cursor = self._credential_cursor()
+        cursor.execute(
+            f'SELECT {_credential_columns(lazy=lazy)} FROM credentials WHERE category = ? ORDER BY website ASC',
+            (category,)
+        )
+        return cursor.fetchall()
     
     def get_categories(self) -> List[Dict[str, Any]]:
         """Get all categories with their credential counts."""
@@ -334,10 +637,9 @@ class VaultDatabase:
         cursor = conn.cursor()
         
         cursor.execute('''
-            SELECT c.name, c.icon, c.color, COUNT(cr.id) as count
+            SELECT c.name, c.icon, c.color, COALESCE(cc.count, 0) as count
             FROM categories c
-            LEFT JOIN credentials cr ON c.name = cr.category
-            GROUP BY c.name
+            LEFT JOIN category_counts cc ON c.name = cc.category
             ORDER BY c.name
         ''')
         
@@ -350,31 +652,114 @@ class VaultDatabase:
         
         now = datetime.now().isoformat()
         
-        cursor.execute('''
-            INSERT INTO activity_logs (action, target, details, timestamp)
-            VALUES (?, ?, ?, ?)
-        ''', (action, target, details, now))
+        with self.batch():
+            cursor.execute('''
+                INSERT INTO activity_logs (action, target, details, timestamp)
+                VALUES (?, ?, ?, ?)
+            ''', (action, target, details, now))
+    
+    def _log_activities(self, entries: List[tuple]):
+        """Log many (action, target, details, timestamp) entries at once."""
+        conn = self._get_connection()
+        cursor = conn.cursor()
         
-        conn.commit()
+        with self.batch():
+            cursor.executemany('''
+                INSERT INTO activity_logs (action, target, details, timestamp)
+                VALUES (?, ?, ?, ?)
+            ''', entries)
     
     def get_activity_logs(self, limit: int = 50) -> List[ActivityLog]:
         """Get recent activity logs."""
+        cursor = self._get_connection().cursor()
+        cursor.row_factory = _activity_log_row
+        
+        cursor.execute(f'''
+            SELECT {', '.join(ACTIVITY_LOG_COLUMNS)} FROM activity_logs ORDER BY timestamp DESC LIMIT ?
+        ''', (limit,))
+        
+        return cursor.fetchall()
+    
+    def compact_activity_logs(self, max_rows: int, max_age_days: int, chunk_size: int = 5000) -> int:
+        """
+        Move logs beyond the newest `max_rows` or older than `max_age_days`
+        into activity_log_archive as zlib-compressed JSON chunks.
+        Returns the number of log entries archived.
+        """
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        cursor.execute('''
-            SELECT * FROM activity_logs ORDER BY timestamp DESC LIMIT ?
-        ''', (limit,))
+        # Highest log id that falls outside the retention window
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+        cursor.execute('SELECT MAX(id) FROM activity_logs WHERE timestamp < ?', (cutoff,))
+        threshold = cursor.fetchone()[0] or 0
+        cursor.execute('SELECT id FROM activity_logs ORDER BY id DESC LIMIT 1 OFFSET ?', (max_rows,))
+        row = cursor.fetchone()
+        if row:
+            threshold = max(threshold, row['id'])
         
-        rows = cursor.fetchall()
+        archived = 0
+        columns = ', '.join(ACTIVITY_LOG_COLUMNS)
+        while True:
+            with self.batch():
+                cursor.execute(f'''
+                    SELECT {columns} FROM activity_logs WHERE id <= ? ORDER BY id LIMIT ?
+                ''', (threshold, chunk_size))
+                rows = [tuple(row) for row in cursor.fetchall()]
+                if not rows:
+                    break
+                
+                payload = zlib.compress(json.dumps(rows).encode(), 9)
+                cursor.execute('''
+                    INSERT INTO activity_log_archive
+                    (first_log_id, last_log_id, first_timestamp, last_timestamp, entry_count, payload)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (rows[0][0], rows[-1][0], rows[0][4], rows[-1][4], len(rows), payload))
+                cursor.execute('DELETE FROM activity_logs WHERE id <= ?', (rows[-1][0],))
+            archived += len(rows)
         
-        return [ActivityLog(
-            id=row['id'],
-            action=row['action'],
-            target=row['target'],
-            details=row['details'],
-            timestamp=row['timestamp']
-        ) for row in rows]
+        return archived
+    
+    def iter_archived_activity_logs(self) -> Iterator[ActivityLog]:
+        """Iterate archived logs, oldest first, one decompressed chunk at a time."""
+        cursor = self._get_connection().cursor()
+        cursor.execute('SELECT payload FROM activity_log_archive ORDER BY id')
+        for row in cursor:
+            for entry in json.loads(zlib.decompress(row['payload'])):
+                yield ActivityLog(*entry)
+    
+    def reclaim_free_pages(self, max_pages: int = 0):
+        """
+        Return free pages to the filesystem with an incremental VACUUM
+        (0 = all). Vaults created before incremental auto-vacuum get a
+        one-off full VACUUM to switch modes.
+        """
+        with self._write_lock:
+            conn = self._get_connection()
+            if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+                conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+                conn.execute('VACUUM')
+            else:
+                conn.execute(f'PRAGMA incremental_vacuum({int(max_pages)})').fetchall()
+    
+    def run_log_retention(self, force: bool = False) -> int:
+        """
+        Periodic log maintenance: archive logs past the configured limits
+        ('log_max_rows', 'log_retention_days') and reclaim the space.
+        Runs at most once a day unless forced. Returns entries archived.
+        """
+        last_run = self.get_setting('log_last_compacted')
+        if not force and last_run and datetime.now() - datetime.fromisoformat(last_run) < timedelta(days=1):
+            return 0
+        
+        archived = self.compact_activity_logs(
+            max_rows=int(self.get_setting('log_max_rows', str(self.DEFAULT_LOG_MAX_ROWS))),
+            max_age_days=int(self.get_setting('log_retention_days', str(self.DEFAULT_LOG_RETENTION_DAYS)))
+        )
+        if archived:
+            self.reclaim_free_pages()
+        self.set_setting('log_last_compacted', datetime.now().isoformat())
+        return archived
     
     def get_setting(self, key: str, default: str = '') -> str:
         """Get a setting value."""
@@ -391,39 +776,50 @@ class VaultDatabase:
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        cursor.execute('''
-            INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)
-        ''', (key, value))
-        
-        conn.commit()
+        with self.batch():
+            cursor.execute('''
+                INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)
+            ''', (key, value))
     
     def get_statistics(self) -> Dict[str, Any]:
-        """Get vault statistics."""
+        """
+        Get vault statistics.
+        Counts come from the category_counts summary table and the top-5
+        lists are index lookups, so the cost does not grow with vault size.
+        Buffered accesses are added in memory; this never writes.
+        """
         conn = self._get_connection()
         cursor = conn.cursor()
         
         stats = {}
         
-        # Total credentials
-        cursor.execute('SELECT COUNT(*) FROM credentials')
-        stats['total_credentials'] = cursor.fetchone()[0]
-        
         # By category
-        cursor.execute('''
-            SELECT category, COUNT(*) as count 
-            FROM credentials 
-            GROUP BY category
-        ''')
+        cursor.execute('SELECT category, count FROM category_counts WHERE count > 0')
         stats['by_category'] = {row['category']: row['count'] for row in cursor.fetchall()}
         
-        # Most accessed
+        # Total credentials
+        stats['total_credentials'] = sum(stats['by_category'].values())
+        
+        # Most accessed: the stored top 5 plus every credential with
+        # buffered accesses, which are the only ones that can overtake it
+        pending = self._access_tracker.pending_counts()
         cursor.execute('''
-            SELECT website, username, access_count 
+            SELECT id, website, username, access_count 
             FROM credentials 
             ORDER BY access_count DESC 
             LIMIT 5
         ''')
-        stats['most_accessed'] = [dict(row) for row in cursor.fetchall()]
+        candidates = {row['id']: dict(row) for row in cursor.fetchall()}
+        if pending:
+            cursor.execute('''
+                SELECT id, website, username, access_count FROM credentials
+                WHERE id IN (SELECT value FROM json_each(?))
+            ''', (json.dumps(list(pending)),))
+            candidates.update((row['id'], dict(row)) for row in cursor.fetchall())
+        for row in candidates.values():
+            row['access_count'] += pending.get(row.pop('id'), 0)
+        stats['most_accessed'] = sorted(candidates.values(), key=lambda row: row['access_count'],
+                                        reverse=True)[:5]
         
         # Recently added
         cursor.execute('''
@@ -436,111 +832,387 @@ class VaultDatabase:
         
         return stats
     
-    def export_vault(self, security_manager, export_password: str) -> str:
-        """Export vault as encrypted JSON."""
-        from .security import SecurityManager
+    def validate_audit_cache(self, context: str):
+        """
+        Drop cached audit results computed under a different `context`
+        (analyzer version, breach list) than the current one.
+        """
+        if self.get_setting('audit_cache_context') == context:
+            return
+        with self.batch():
+            self._get_connection().execute('DELETE FROM audit_cache')
+            self.set_setting('audit_cache_context', context)
+    
+    def get_audit_page(self, after_id: int, limit: int) -> List[sqlite3.Row]:
+        """
+        The next `limit` credentials by id with their cached audit results.
+        Rows whose result is current have cached = 1; the others have NULL
+        results. Rows that are not cached or have no password fingerprint
+        (needs_fingerprint = 1) carry encrypted_password.
+        """
+        cursor = self._get_connection().cursor()
+        cursor.execute('''
+            SELECT c.id, c.website, c.username, c.last_updated,
+                   a.last_updated IS c.last_updated AS cached,
+                   c.password_fingerprint IS NULL AS needs_fingerprint,
+                   CASE WHEN a.last_updated IS c.last_updated AND c.password_fingerprint IS NOT NULL
+                        THEN NULL ELSE c.encrypted_password END AS encrypted_password,
+                   a.score, a.rating, a.issues, a.breached
+            FROM credentials AS c
+            LEFT JOIN audit_cache AS a ON a.credential_id = c.id
+            WHERE c.id > ?
+            ORDER BY c.id LIMIT ?
+        ''', (after_id, limit))
+        return cursor.fetchall()
+    
+    def save_audit_results(self, rows: List[tuple]):
+        """Store (credential_id, last_updated, score, rating, issues, breached) rows."""
+        with self.batch():
+            self._get_connection().executemany('''
+                INSERT OR REPLACE INTO audit_cache
+                (credential_id, last_updated, score, rating, issues, breached)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', rows)
+    
+    def get_unfingerprinted_credentials(self, after_id: int, limit: int) -> List[Tuple[int, Union[bytes, str]]]:
+        """(id, encrypted_password) of the next `limit` credentials by id with no password fingerprint."""
+        cursor = self._get_connection().cursor()
+        cursor.execute('''
+            SELECT id, encrypted_password FROM credentials
+            WHERE password_fingerprint IS NULL AND id > ?
+            ORDER BY id LIMIT ?
+        ''', (after_id, limit))
+        return [tuple(row) for row in cursor.fetchall()]
+    
+    def set_password_fingerprints(self, rows: List[Tuple[int, bytes]]):
+        """Store (id, fingerprint) rows without touching last_updated."""
+        with self.batch():
+            self._get_connection().executemany(
+                'UPDATE credentials SET password_fingerprint = ? WHERE id = ?',
+                [(fingerprint, cred_id) for cred_id, fingerprint in rows]
+            )
+    
+    def get_sites_using_password(self, fingerprint: bytes, exclude_id: Optional[int] = None) -> List[str]:
+        """Websites of the credentials whose password has this fingerprint."""
+        cursor = self._get_connection().cursor()
+        cursor.execute('''
+            SELECT website FROM credentials
+            WHERE password_fingerprint = ? AND id IS NOT ?
+        ''', (fingerprint, exclude_id))
+        # A handful of rows: sorting here keeps the query on the index alone
+        return sorted(row['website'] for row in cursor.fetchall())
+    
+    def get_reused_password_groups(self, limit: int = -1) -> List[List[str]]:
+        """
+        Websites sharing a password, one list per reused password (at most
+        `limit` lists). No decryption involved.
+        """
+        cursor = self._get_connection().cursor()
+        cursor.execute('''
+            SELECT json_group_array(website) AS websites FROM credentials
+            WHERE password_fingerprint IS NOT NULL
+            GROUP BY password_fingerprint
+            HAVING COUNT(*) > 1
+            LIMIT ?
+        ''', (limit,))
+        return [json.loads(row['websites']) for row in cursor.fetchall()]
+    
+    def count_reused_passwords(self) -> int:
+        """Number of credentials whose password is also used by another one."""
+        cursor = self._get_connection().cursor()
+        cursor.execute('''
+            SELECT COALESCE(SUM(uses), 0) FROM (
+                SELECT COUNT(*) AS uses FROM credentials
+                WHERE password_fingerprint IS NOT NULL
+                GROUP BY password_fingerprint
+                HAVING uses > 1
+            )
+        ''')
+        return cursor.fetchone()[0]
+    
+    def get_rekey_state(self) -> Optional[Dict[str, Any]]:
+        """The in-progress master key rotation checkpoint, if any."""
+        cursor = self._get_connection().cursor()
+        cursor.execute('SELECT * FROM rekey_state WHERE id = 1')
+        row = cursor.fetchone()
+        return dict(row) if row else None
+    
+    def begin_rekey(self, wrapped_key: str, verifier: str) -> Dict[str, Any]:
+        """Record the start of a key rotation over every current credential."""
+        with self.batch():
+            cursor = self._get_connection().cursor()
+            cursor.execute('''
+                INSERT INTO rekey_state (id, wrapped_key, verifier, total, started_at)
+                VALUES (1, ?, ?, ?, ?)
+            ''', (wrapped_key, verifier, self.get_credential_count(), datetime.now().isoformat()))
+        return self.get_rekey_state()
+    
+    def get_ciphertext_batch(self, after_id: int, limit: int) -> List[Tuple[int, Union[bytes, str]]]:
+        """(id, encrypted_password) of the next `limit` credentials by id."""
+        cursor = self._get_connection().cursor()
+        cursor.execute('''
+            SELECT id, encrypted_password FROM credentials WHERE id > ? ORDER BY id LIMIT ?
+        ''', (after_id, limit))
+        return [tuple(row) for row in cursor.fetchall()]
+    
+    def apply_rekey_batch(self, rows: List[Tuple[int, Union[bytes, str], Optional[bytes]]]):
+        """
+        Store (id, re-encrypted password, fingerprint under the new key)
+        rows and advance the checkpoint in one transaction.
+        """
+        with self.batch():
+            cursor = self._get_connection().cursor()
+            cursor.executemany(
+                'UPDATE credentials SET encrypted_password = ?, password_fingerprint = ? WHERE id = ?',
+                [(ciphertext, fingerprint, cred_id) for cred_id, ciphertext, fingerprint in rows]
+            )
+            cursor.execute('UPDATE rekey_state SET last_id = ?, done = done + ? WHERE id = 1',
+                           (rows[-1][0], len(rows)))
+    
+    def finish_rekey(self, details: str):
+        """Drop the checkpoint once the new key is live."""
+        with self.batch():
+            self._get_connection().execute('DELETE FROM rekey_state')
+            self._log_activity('UPDATE', 'Encryption Key', details)
+    
+    CONVERSION_BATCH_SIZE = 1000
+    
+    def convert_legacy_ciphertexts(self, batch_size: int = CONVERSION_BATCH_SIZE,
+                                   stop: Optional[threading.Event] = None) -> int:
+        """
+        Rewrite text-format ciphertexts in the binary format, one batch per
+        transaction. This only strips a layer of base64, so it needs no key
+        and can run while the vault is locked. Rows that do not decode are
+        left as they are. Returns the number of rows converted.
+        """
+        last_id = 0
+        converted = 0
+        while True:
+            if stop is not None and stop.is_set():
+                return converted  # Interrupted; the next run starts over cheaply
+            with self.batch():
+                rows = self.get_ciphertext_batch(last_id, batch_size)
+                if not rows:
+                    break
+                updates = []
+                for cred_id, ciphertext in rows:
+                    if not is_legacy_ciphertext(ciphertext):
+                        continue
+                    try:
+                        updates.append((upgrade_legacy_ciphertext(ciphertext), cred_id))
+                    except ValueError:
+                        continue  # Already unreadable; keep it for the audit to report
+                self._get_connection().executemany(
+                    'UPDATE credentials SET encrypted_password = ? WHERE id = ?', updates
+                )
+            last_id = rows[-1][0]
+            converted += len(updates)
+        
+        self.set_setting('ciphertext_format', 'binary')
+        return converted
+    
+    def start_ciphertext_conversion(self):
+        """Convert legacy ciphertexts on a daemon thread, once per vault."""
+        if self.get_setting('ciphertext_format') == 'binary' or self._conversion_thread is not None:
+            return
+        self._conversion_stop.clear()
+        self._conversion_thread = threading.Thread(
+            target=self._run_ciphertext_conversion, name='vault-ciphertext-conversion', daemon=True
+        )
+        self._conversion_thread.start()
+    
+    def _run_ciphertext_conversion(self):
+        try:
+            converted = self.convert_legacy_ciphertexts(stop=self._conversion_stop)
+        except sqlite3.Error:
+            return  # Retried on the next start; both formats stay readable
+        if converted:
+            with self.batch():
+                self._log_activity('UPDATE', 'Vault', f"Converted {converted} credentials to binary storage")
+    
+    def _stop_ciphertext_conversion(self):
+        self._conversion_stop.set()
+        if self._conversion_thread is not None:
+            self._conversion_thread.join()
+            self._conversion_thread = None
+    
+    def export_vault(self, security_manager, export_password: str, out: BinaryIO) -> int:
+        """
+        Stream an encrypted export to the binary file object `out` in the
+        framed format of core.backup: credentials are read, decrypted and
+        written one chunk at a time. The backup is keyed with the vault's
+        own KDF parameters, recorded in the header. Returns the number of
+        credentials exported.
+        """
+        from .backup import BackupHeader, BackupWriter
+        from .kdf import calibrate
         
-        credentials = self.get_all_credentials()
+        # Through the session key cache: re-exporting to the same password
+        # reuses its salt and skips the KDF
+        params = security_manager.kdf_params or calibrate()
+        salt, key = security_manager.derive_backup_key(export_password, params)
+        writer = BackupWriter(out, BackupHeader(params, salt), key)
         
-        # Decrypt all passwords first, then re-encrypt with export password
-        export_data = []
-        for cred in credentials:
-            try:
-                decrypted_pw = security_manager.decrypt(cred.encrypted_password)
-                export_data.append({
+        cursor = self._credential_cursor()
+        cursor.execute(f'SELECT {_credential_columns()} FROM credentials ORDER BY id')
+        while True:
+            credentials = cursor.fetchmany(writer.chunk_size)
+            if not credentials:
+                break
+            passwords = security_manager.decrypt_many(
+                (cred.encrypted_password for cred in credentials), strict=False
+            )
+            for cred, decrypted_pw in zip(credentials, passwords):
+                if decrypted_pw is None:
+                    continue
+                writer.write({
                     'website': cred.website,
                     'username': cred.username,
-                    'password': decrypted_pw,  # Will be encrypted below
+                    'password': decrypted_pw,
                     'notes': cred.notes,
                     'category': cred.category,
                     'created_at': cred.created_at,
                 })
-            except:
-                continue
-        
-        # Encrypt export with export password
-        import base64
-        from cryptography.fernet import Fernet
-        from cryptography.hazmat.primitives import hashes
-        from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-        import secrets
-        
-        salt = secrets.token_bytes(32)
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=480000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(export_password.encode()))
-        fernet = Fernet(key)
-        
-        json_data = json.dumps(export_data)
-        encrypted = fernet.encrypt(json_data.encode())
+        count = writer.close()
         
-        # Combine salt and encrypted data
-        combined = base64.urlsafe_b64encode(salt + encrypted).decode()
+        self._log_activity('EXPORT', 'Vault', f'Exported {count} credentials')
         
-        self._log_activity('EXPORT', 'Vault', f'Exported {len(export_data)} credentials')
-        
-        return combined
+        return count
     
-    def import_vault(self, security_manager, encrypted_data: str, import_password: str) -> int:
-        """Import credentials from encrypted export."""
+    def _read_legacy_export(self, security_manager, encrypted_data: str,
+                            import_password: str) -> List[Dict[str, Any]]:
+        """
+        Decrypt a pre-framing export in one piece: base64(salt + token)
+        with fixed PBKDF2 parameters.
+        """
         import base64
         from cryptography.fernet import Fernet
-        from cryptography.hazmat.primitives import hashes
-        from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+        from .kdf import LEGACY_PARAMS
         
-        # Decode and split salt from data
         combined = base64.urlsafe_b64decode(encrypted_data.encode())
         salt = combined[:32]
         encrypted = combined[32:]
         
-        # Derive key and decrypt
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=480000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(import_password.encode()))
-        fernet = Fernet(key)
-        
-        decrypted = fernet.decrypt(encrypted)
-        import_data = json.loads(decrypted.decode())
+        _, key = security_manager.derive_backup_key(import_password, LEGACY_PARAMS, salt)
+        return json.loads(Fernet(key).decrypt(encrypted).decode())
+    
+    IMPORT_SKIP = 'skip'      # Keep the vault's entry
+    IMPORT_UPDATE = 'update'  # Overwrite it with the imported one
+    
+    def _import_chunk(self, security_manager, items: List[Dict[str, Any]],
+                      on_conflict: str, report: ImportReport, seen: set):
+        """
+        Validate one chunk of export records, re-encrypt the ones to write on
+        the bulk engine and store them with a single upsert statement.
+        `seen` holds the (website, username) keys of earlier chunks: the
+        first record for a key is imported, later ones count as failed.
+        """
+        cursor = self._get_connection().cursor()
+        now = datetime.now().isoformat()
         
-        # Import credentials
-        imported_count = 0
-        for item in import_data:
-            try:
-                # Re-encrypt password with vault's key
-                encrypted_pw = security_manager.encrypt(item['password'])
-                
-                cred = Credential(
-                    id=None,
-                    website=item['website'],
-                    username=item['username'],
-                    encrypted_password=encrypted_pw,
-                    notes=item.get('notes', ''),
-                    category=item.get('category', 'General'),
-                    created_at=item.get('created_at', datetime.now().isoformat()),
-                    last_updated=datetime.now().isoformat(),
-                    last_accessed=None,
-                    access_count=0
-                )
-                
-                self.add_credential(cred)
-                imported_count += 1
-            except:
+        entries = {}
+        for item in items:
+            if not isinstance(item, dict):
+                report.failed.append(('?', "not a credential record"))
                 continue
+            website, username, password = item.get('website'), item.get('username'), item.get('password')
+            label = f"{website or '?'} ({username or '?'})"
+            if not website or not isinstance(website, str) or not isinstance(username, str):
+                report.failed.append((label, "missing website or username"))
+                continue
+            if not isinstance(password, str):
+                report.failed.append((label, "missing password"))
+                continue
+            if (website, username) in seen:
+                report.failed.append((label, "duplicate in import file"))
+                continue
+            seen.add((website, username))
+            entries[(website, username)] = item
+        
+        if not entries:
+            return
+        
+        # One unique-index probe per entry, in a single statement
+        cursor.execute('''
+            SELECT c.website, c.username FROM json_each(?) AS j
+            JOIN credentials AS c
+              ON c.website = json_extract(j.value, '$[0]') AND c.username = json_extract(j.value, '$[1]')
+        ''', (json.dumps(list(entries)),))
+        existing = {(row['website'], row['username']) for row in cursor.fetchall()}
+        report.inserted += len(entries) - len(existing)
+        
+        if on_conflict == self.IMPORT_UPDATE:
+            report.updated += len(existing)
+            conflict_clause = '''DO UPDATE SET
+                encrypted_password = excluded.encrypted_password,
+                password_fingerprint = excluded.password_fingerprint,
+                notes = excluded.notes,
+                category = excluded.category,
+                last_updated = excluded.last_updated'''
+        else:
+            report.skipped += len(existing)
+            for key in existing:
+                del entries[key]
+            conflict_clause = 'DO NOTHING'
+        
+        items = list(entries.values())
+        ciphertexts = security_manager.encrypt_many(item['password'] for item in items)
+        rows = [(
+            item['website'],
+            item['username'],
+            ciphertext,
+            item.get('notes') or '',
+            item.get('category') or 'General',
+            item['created_at'] if isinstance(item.get('created_at'), str) else now,
+            now,
+            security_manager.fingerprint(item['password'])
+        ) for item, ciphertext in zip(items, ciphertexts)]
+        
+        cursor.executemany(f'''
+            INSERT INTO credentials 
+            (website, username, encrypted_password, notes, category, created_at, last_updated,
+             password_fingerprint)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(website, username) {conflict_clause}
+        ''', rows)
+    
+    def import_vault(self, security_manager, source: BinaryIO, import_password: str,
+                     on_conflict: str = IMPORT_SKIP) -> ImportReport:
+        """
+        Import credentials from an encrypted export read from the binary
+        file object `source`. Framed exports are decrypted and upserted a
+        chunk at a time; older single-token exports are still accepted.
+        Entries already in the vault (same website and username) are kept
+        or overwritten according to `on_conflict`. The import is one
+        transaction, so a damaged file imports nothing.
+        """
+        from .backup import MAGIC, BackupReader, is_framed, read_header
+        
+        if on_conflict not in (self.IMPORT_SKIP, self.IMPORT_UPDATE):
+            raise ValueError(f"Unknown conflict policy '{on_conflict}'")
+        
+        prefix = source.read(len(MAGIC))
+        if is_framed(prefix):
+            header = read_header(source, magic=prefix)
+            _, key = security_manager.derive_backup_key(import_password, header.params, header.salt)
+            chunks = BackupReader(source, header, key).chunks()
+        else:
+            legacy = (prefix + source.read()).decode()
+            chunks = iter([self._read_legacy_export(security_manager, legacy, import_password)])
         
-        self._log_activity('IMPORT', 'Vault', f'Imported {imported_count} credentials')
+        report = ImportReport()
+        seen = set()
+        with self.batch():
+            for items in chunks:
+                self._import_chunk(security_manager, items, on_conflict, report, seen)
+            self._log_activity('IMPORT', 'Vault', f'Imported credentials: {report.summary()}')
         
-        return imported_count
+        return report
     
     def close(self):
-        """Close database connection."""
+        """Flush buffered access tracking and close database connection."""
+        self._access_tracker.stop()
+        self._stop_ciphertext_conversion()
         if self._connection:
             self._connection.close()
             self._connection = None
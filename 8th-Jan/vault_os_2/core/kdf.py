@@ -0,0 +1,336 @@
+"""
+╔═══════════════════════════════════════════════════════════════════════════════╗
+║                           KDF MODULE                                          ║
+║              Pluggable Password-Based Key Derivation Backends                 ║
+╚═══════════════════════════════════════════════════════════════════════════════╝
+
+Every backend turns (password, salt, cost) into a 32-byte key. The cost is a
+plain dict of integers so it can be stored in the vault header as JSON and a
+vault keeps working when the defaults for new vaults change.
+
+calibrate() times a backend on the current host and scales its cost to a
+target latency instead of relying on one hardcoded iteration count.
+
+DerivedKeyCache keeps recent derivations in memory so repeated exports and
+quick lock/unlock cycles skip the KDF; keys are zeroed when evicted.
+"""
+
+import hashlib
+import hmac
+import json
+import math
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+
+try:
+    from cryptography.hazmat.primitives.kdf.argon2 import Argon2id
+except ImportError:  # cryptography < 44
+    Argon2id = None
+
+
+KEY_LENGTH = 32
+
+# Unlock latency new vaults are calibrated for
+DEFAULT_TARGET_MS = 500
+
+
+@dataclass
+class KDFParams:
+    """A KDF backend name plus its cost parameters."""
+    name: str
+    cost: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'name': self.name, **self.cost}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'KDFParams':
+        data = dict(data)
+        name = data.pop('name')
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown KDF '{name}'")
+        return cls(name=name, cost={k: int(v) for k, v in data.items()})
+
+    def describe(self) -> str:
+        cost = ', '.join(f"{k}={v}" for k, v in self.cost.items())
+        return f"{self.name} ({cost})"
+
+
+class KDFBackend:
+    """Base class for a key derivation function."""
+
+    name = ''
+    default_cost: Dict[str, int] = {}
+    # Floor that calibration never goes below, however slow the host
+    min_cost: Dict[str, int] = {}
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    @classmethod
+    def derive(cls, password: bytes, salt: bytes, cost: Dict[str, int]) -> bytes:
+        raise NotImplementedError
+
+    @classmethod
+    def scale(cls, cost: Dict[str, int], factor: float) -> Dict[str, int]:
+        """A cost expected to take `factor` times as long as `cost`."""
+        raise NotImplementedError
+
+
+class PBKDF2Backend(KDFBackend):
+    """PBKDF2-HMAC-SHA256; the original Vault OS KDF."""
+
+    name = 'pbkdf2-sha256'
+    default_cost = {'iterations': 480000}
+    min_cost = {'iterations': 100000}
+
+    @classmethod
+    def derive(cls, password: bytes, salt: bytes, cost: Dict[str, int]) -> bytes:
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=KEY_LENGTH,
+            salt=salt,
+            iterations=cost['iterations'],
+        )
+        return kdf.derive(password)
+
+    @classmethod
+    def scale(cls, cost: Dict[str, int], factor: float) -> Dict[str, int]:
+        iterations = int(round(cost['iterations'] * factor, -3))
+        return {'iterations': max(cls.min_cost['iterations'], iterations)}
+
+
+class ScryptBackend(KDFBackend):
+    """scrypt; memory-hard, always available through OpenSSL."""
+
+    name = 'scrypt'
+    default_cost = {'n': 2 ** 17, 'r': 8, 'p': 1}
+    min_cost = {'n': 2 ** 14, 'r': 8, 'p': 1}
+    MAX_N = 2 ** 20  # 1 GiB of memory at r=8
+
+    @classmethod
+    def derive(cls, password: bytes, salt: bytes, cost: Dict[str, int]) -> bytes:
+        kdf = Scrypt(salt=salt, length=KEY_LENGTH, n=cost['n'], r=cost['r'], p=cost['p'])
+        return kdf.derive(password)
+
+    @classmethod
+    def scale(cls, cost: Dict[str, int], factor: float) -> Dict[str, int]:
+        # n must stay a power of two; time grows linearly with it
+        n = 2 ** round(math.log2(max(1.0, cost['n'] * factor)))
+        return {**cost, 'n': min(cls.MAX_N, max(cls.min_cost['n'], n))}
+
+
+class Argon2idBackend(KDFBackend):
+    """Argon2id; preferred when the installed cryptography provides it."""
+
+    name = 'argon2id'
+    default_cost = {'iterations': 3, 'lanes': 4, 'memory_cost': 64 * 1024}  # KiB
+    min_cost = {'iterations': 2, 'lanes': 4, 'memory_cost': 19 * 1024}
+
+    @classmethod
+    def available(cls) -> bool:
+        return Argon2id is not None
+
+    @classmethod
+    def derive(cls, password: bytes, salt: bytes, cost: Dict[str, int]) -> bytes:
+        if Argon2id is None:
+            raise RuntimeError("Argon2id requires cryptography >= 44")
+        kdf = Argon2id(
+            salt=salt,
+            length=KEY_LENGTH,
+            iterations=cost['iterations'],
+            lanes=cost['lanes'],
+            memory_cost=cost['memory_cost'],
+        )
+        return kdf.derive(password)
+
+    @classmethod
+    def scale(cls, cost: Dict[str, int], factor: float) -> Dict[str, int]:
+        # Spend extra time on passes at the default memory size; on slow
+        # hosts shrink memory rather than dropping below two passes
+        work = cost['iterations'] * cost['memory_cost'] * factor
+        memory = cls.default_cost['memory_cost']
+        iterations = int(round(work / memory))
+        if iterations < cls.min_cost['iterations']:
+            iterations = cls.min_cost['iterations']
+            memory = max(cls.min_cost['memory_cost'], int(work / iterations) // 1024 * 1024)
+        return {'iterations': iterations, 'lanes': cost['lanes'], 'memory_cost': memory}
+
+
+# Strongest first; new vaults use the first available backend
+BACKENDS: Dict[str, type] = {
+    backend.name: backend
+    for backend in (Argon2idBackend, ScryptBackend, PBKDF2Backend)
+}
+
+# Parameters of vaults created before the KDF header existed
+LEGACY_PARAMS = KDFParams(PBKDF2Backend.name, dict(PBKDF2Backend.default_cost))
+
+
+def available_backends() -> List[str]:
+    """Names of the backends usable with the installed libraries."""
+    return [name for name, backend in BACKENDS.items() if backend.available()]
+
+
+def default_params(name: Optional[str] = None) -> KDFParams:
+    """Default parameters for `name`, or for the strongest available backend."""
+    name = name or available_backends()[0]
+    if name not in BACKENDS or not BACKENDS[name].available():
+        raise ValueError(f"KDF '{name}' is not available")
+    return KDFParams(name, dict(BACKENDS[name].default_cost))
+
+
+def derive_key(password: str, salt: bytes, params: KDFParams) -> bytes:
+    """Derive a raw 32-byte key."""
+    return BACKENDS[params.name].derive(password.encode(), salt, params.cost)
+
+
+def time_derivation(params: KDFParams) -> float:
+    """Seconds one derivation with `params` takes on this host."""
+    start = time.perf_counter()
+    BACKENDS[params.name].derive(b'calibration', b'\0' * 16, params.cost)
+    return time.perf_counter() - start
+
+
+def calibrate(name: Optional[str] = None, target_ms: int = DEFAULT_TARGET_MS) -> KDFParams:
+    """
+    Pick cost parameters so one derivation takes about `target_ms` here.
+    Probes at the minimum cost, scales up, then corrects once against a
+    measurement of the chosen cost.
+    """
+    params = default_params(name)
+    backend = BACKENDS[params.name]
+    target = target_ms / 1000
+
+    cost = dict(backend.min_cost)
+    for _ in range(2):
+        elapsed = time_derivation(KDFParams(params.name, cost))
+        if abs(elapsed - target) <= target * 0.2:
+            break
+        cost = backend.scale(cost, target / max(elapsed, 1e-4))
+
+    return KDFParams(params.name, cost)
+
+
+# DerivedKeyCache namespaces
+MASTER_NAMESPACE = 'master'
+BACKUP_NAMESPACE = 'backup'
+
+
+def _wipe(buffer: bytearray):
+    buffer[:] = bytes(len(buffer))
+
+
+class DerivedKeyCache:
+    """
+    Bounded LRU of derived keys keyed by (namespace, password digest, salt,
+    params). The namespace keeps derivations for different purposes (the
+    master key, backups) apart, so a lookup for one never returns the salt
+    or key of another even when the passwords match.
+
+    Passwords are never stored: the digest is an HMAC under a per-process
+    random key. Entries live while the session is open; suspend() starts a
+    grace period of `ttl` seconds after which they are wiped, and wipe()
+    zeroes them immediately.
+    """
+
+    def __init__(self, max_entries: int = 8, ttl: float = 300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._secret = secrets.token_bytes(32)
+        self._entries: 'OrderedDict[Tuple[str, bytes, bytes, str], bytearray]' = OrderedDict()
+        self._deadline: Optional[float] = None  # None while the session is open
+        self._lock = threading.Lock()
+
+    def _key(self, password: str, salt: bytes, params: KDFParams,
+             namespace: str) -> Tuple[str, bytes, bytes, str]:
+        digest = hmac.new(self._secret, password.encode(), hashlib.sha256).digest()
+        return namespace, digest, bytes(salt), json.dumps(params.to_dict(), sort_keys=True)
+
+    def _expire(self):
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            self._clear()
+
+    def _clear(self):
+        for key in self._entries.values():
+            _wipe(key)
+        self._entries.clear()
+        self._deadline = None
+
+    def get(self, password: str, salt: bytes, params: KDFParams,
+            namespace: str = MASTER_NAMESPACE) -> Optional[bytes]:
+        with self._lock:
+            self._expire()
+            cache_key = self._key(password, salt, params, namespace)
+            entry = self._entries.get(cache_key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(cache_key)
+            return bytes(entry)
+
+    def put(self, password: str, salt: bytes, params: KDFParams, key: bytes,
+            namespace: str = MASTER_NAMESPACE):
+        with self._lock:
+            self._expire()
+            cache_key = self._key(password, salt, params, namespace)
+            old = self._entries.pop(cache_key, None)
+            if old is not None:
+                _wipe(old)
+            self._entries[cache_key] = bytearray(key)
+            while len(self._entries) > self.max_entries:
+                _wipe(self._entries.popitem(last=False)[1])
+
+    def find_salt(self, password: str, params: KDFParams,
+                  namespace: str = MASTER_NAMESPACE) -> Optional[bytes]:
+        """Salt of a cached key for this password, params and namespace, if any."""
+        with self._lock:
+            self._expire()
+            _, digest, _, encoded = self._key(password, b'', params, namespace)
+            for entry_namespace, entry_digest, salt, entry_params in reversed(self._entries):
+                if (entry_namespace == namespace and hmac.compare_digest(entry_digest, digest)
+                        and entry_params == encoded):
+                    return salt
+            return None
+
+    def purge(self):
+        """Wipe the entries if their grace period is over."""
+        with self._lock:
+            self._expire()
+
+    def expires_in(self) -> Optional[float]:
+        """Seconds until a suspended cache is wiped; None if not suspended."""
+        with self._lock:
+            if self._deadline is None or not self._entries:
+                return None
+            return max(0.0, self._deadline - time.monotonic())
+
+    def resume(self):
+        """Session (re)opened: keep entries until the next suspend/wipe."""
+        with self._lock:
+            self._expire()
+            self._deadline = None
+
+    def suspend(self):
+        """Session ended without a full wipe: keep entries for `ttl` seconds."""
+        with self._lock:
+            self._deadline = time.monotonic() + self.ttl
+
+    def wipe(self):
+        """Zero and drop every cached key."""
+        with self._lock:
+            self._clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire()
+            return len(self._entries)
+
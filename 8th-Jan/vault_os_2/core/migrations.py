@@ -0,0 +1,304 @@
+"""
+╔═══════════════════════════════════════════════════════════════════════════════╗
+║                        MIGRATIONS MODULE                                      ║
+║              Versioned Schema Upgrades Tracked by PRAGMA user_version         ║
+╚═══════════════════════════════════════════════════════════════════════════════╝
+
+Each migration is an idempotent function that takes an open connection.
+MIGRATIONS[n - 1] upgrades a database from user_version n - 1 to n, so new
+steps are only ever appended. A database that is already current costs a
+single PRAGMA read at startup.
+"""
+
+import sqlite3
+from typing import Callable, List
+
+
+def _initial_schema(conn: sqlite3.Connection):
+    """v1: base tables, default categories and the query indexes."""
+    # Credentials table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS credentials (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            website TEXT NOT NULL,
+            username TEXT NOT NULL,
+            encrypted_password TEXT NOT NULL,
+            notes TEXT DEFAULT '',
+            category TEXT DEFAULT 'General',
+            created_at TEXT NOT NULL,
+            last_updated TEXT NOT NULL,
+            last_accessed TEXT,
+            access_count INTEGER DEFAULT 0,
+            UNIQUE(website, username)
+        )
+    ''')
+
+    # Activity logs table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS activity_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            action TEXT NOT NULL,
+            target TEXT NOT NULL,
+            details TEXT DEFAULT '',
+            timestamp TEXT NOT NULL
+        )
+    ''')
+
+    # Settings table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+    ''')
+
+    # Categories table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            icon TEXT DEFAULT '📁',
+            color TEXT DEFAULT 'white'
+        )
+    ''')
+
+    # Insert default categories
+    default_categories = [
+        ('General', '📁', 'white'),
+        ('Social Media', '💬', 'cyan'),
+        ('Finance', '💰', 'green'),
+        ('Work', '💼', 'blue'),
+        ('Gaming', '🎮', 'magenta'),
+        ('Shopping', '🛒', 'yellow'),
+    ]
+
+    conn.executemany('''
+        INSERT OR IGNORE INTO categories (name, icon, color) VALUES (?, ?, ?)
+    ''', default_categories)
+
+    # website ordering is already served by the UNIQUE(website, username) index
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_credentials_category
+        ON credentials (category, website)
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_credentials_last_updated
+        ON credentials (last_updated)
+    ''')
+    # Covering indexes for the most-accessed / recently-added statistics
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_credentials_access_count
+        ON credentials (access_count, website, username)
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_credentials_created_at
+        ON credentials (created_at, website, username)
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_activity_logs_timestamp
+        ON activity_logs (timestamp)
+    ''')
+
+
+def _search_index(conn: sqlite3.Connection):
+    """v2: FTS5 index over website, username, category and notes."""
+    try:
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS credentials_fts USING fts5(
+                website, username, category, notes,
+                content='credentials', content_rowid='id', prefix='2 3'
+            )
+        ''')
+    except sqlite3.OperationalError:
+        return  # SQLite built without FTS5; search falls back to LIKE
+
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS credentials_fts_insert AFTER INSERT ON credentials BEGIN
+            INSERT INTO credentials_fts (rowid, website, username, category, notes)
+            VALUES (new.id, new.website, new.username, new.category, new.notes);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS credentials_fts_delete AFTER DELETE ON credentials BEGIN
+            INSERT INTO credentials_fts (credentials_fts, rowid, website, username, category, notes)
+            VALUES ('delete', old.id, old.website, old.username, old.category, old.notes);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS credentials_fts_update
+        AFTER UPDATE OF website, username, category, notes ON credentials BEGIN
+            INSERT INTO credentials_fts (credentials_fts, rowid, website, username, category, notes)
+            VALUES ('delete', old.id, old.website, old.username, old.category, old.notes);
+            INSERT INTO credentials_fts (rowid, website, username, category, notes)
+            VALUES (new.id, new.website, new.username, new.category, new.notes);
+        END
+    ''')
+
+    # Index credentials that existed before the migration
+    conn.execute("INSERT INTO credentials_fts (credentials_fts) VALUES ('rebuild')")
+
+
+def _keyset_index(conn: sqlite3.Connection):
+    """v3: (website, id) ordering for keyset-paginated listing."""
+    # A single-column index carries the rowid, so it is ordered by (website, id)
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_credentials_website
+        ON credentials (website)
+    ''')
+
+
+def _category_counts(conn: sqlite3.Connection):
+    """v4: per-category credential counters maintained by triggers."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS category_counts (
+            category TEXT PRIMARY KEY,
+            count INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS category_counts_insert AFTER INSERT ON credentials BEGIN
+            INSERT INTO category_counts (category, count) VALUES (new.category, 1)
+            ON CONFLICT (category) DO UPDATE SET count = count + 1;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS category_counts_delete AFTER DELETE ON credentials BEGIN
+            UPDATE category_counts SET count = count - 1 WHERE category = old.category;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS category_counts_update
+        AFTER UPDATE OF category ON credentials
+        WHEN old.category IS NOT new.category BEGIN
+            UPDATE category_counts SET count = count - 1 WHERE category = old.category;
+            INSERT INTO category_counts (category, count) VALUES (new.category, 1)
+            ON CONFLICT (category) DO UPDATE SET count = count + 1;
+        END
+    ''')
+
+    # Count credentials that existed before the migration
+    conn.execute('DELETE FROM category_counts')
+    conn.execute('''
+        INSERT INTO category_counts (category, count)
+        SELECT category, COUNT(*) FROM credentials GROUP BY category
+    ''')
+
+
+def _activity_log_archive(conn: sqlite3.Connection):
+    """v5: compressed archive for activity logs past the retention window."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS activity_log_archive (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_log_id INTEGER NOT NULL,
+            last_log_id INTEGER NOT NULL,
+            first_timestamp TEXT NOT NULL,
+            last_timestamp TEXT NOT NULL,
+            entry_count INTEGER NOT NULL,
+            payload BLOB NOT NULL
+        )
+    ''')
+
+
+def _rekey_state(conn: sqlite3.Connection):
+    """v6: checkpoint of an in-progress master key rotation (at most one row)."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS rekey_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            wrapped_key TEXT NOT NULL,
+            verifier TEXT NOT NULL,
+            last_id INTEGER NOT NULL DEFAULT 0,
+            done INTEGER NOT NULL DEFAULT 0,
+            total INTEGER NOT NULL,
+            started_at TEXT NOT NULL
+        )
+    ''')
+
+
+def _audit_cache(conn: sqlite3.Connection):
+    """v7: per-credential security audit results, valid while last_updated matches."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS audit_cache (
+            credential_id INTEGER PRIMARY KEY,
+            last_updated TEXT NOT NULL,
+            score INTEGER NOT NULL,
+            rating TEXT NOT NULL,
+            issues INTEGER NOT NULL,
+            breached INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS audit_cache_delete AFTER DELETE ON credentials BEGIN
+            DELETE FROM audit_cache WHERE credential_id = old.id;
+        END
+    ''')
+
+
+def _password_fingerprints(conn: sqlite3.Connection):
+    """v8: keyed password fingerprints on credentials, for reuse detection."""
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(credentials)')}
+    if 'password_fingerprint' not in columns:
+        # NULL until filled in by VaultDatabase.set_password_fingerprints()
+        conn.execute('ALTER TABLE credentials ADD COLUMN password_fingerprint BLOB')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_credentials_fingerprint
+        ON credentials (password_fingerprint)
+    ''')
+
+
+# Ordered migrations; append only, never reorder or remove
+MIGRATIONS: List[Callable[[sqlite3.Connection], None]] = [
+    _initial_schema,
+    _search_index,
+    _keyset_index,
+    _category_counts,
+    _activity_log_archive,
+    _rekey_state,
+    _audit_cache,
+    _password_fingerprints,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Read the schema version stored in the database header."""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """
+    Apply pending migrations, each in its own transaction together with
+    its user_version bump. Returns the resulting schema version.
+    """
+    version = get_schema_version(conn)
+
+    if version == SCHEMA_VERSION:
+        return version
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Vault database schema v{version} is newer than this version "
+            f"of Vault OS supports (v{SCHEMA_VERSION})"
+        )
+
+    if version == 0 and conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table'").fetchone() is None:
+        # New vaults start in incremental auto-vacuum mode. The file header
+        # may already be written (journal_mode), so VACUUM the empty
+        # database to apply it. Vaults from before user_version are also
+        # at version 0 but hold data; they are converted by
+        # VaultDatabase.reclaim_free_pages() instead of a VACUUM here
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+            conn.execute('VACUUM')
+
+    for number in range(version + 1, SCHEMA_VERSION + 1):
+        conn.execute('BEGIN')
+        try:
+            MIGRATIONS[number - 1](conn)
+            conn.execute(f'PRAGMA user_version = {number}')
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    return SCHEMA_VERSION
@@ -0,0 +1,109 @@
+"""
+╔═══════════════════════════════════════════════════════════════════════════════╗
+║                           REKEY MODULE                                        ║
+║              Crash-Safe Data Key Rotation in Bounded Batches                  ║
+╚═══════════════════════════════════════════════════════════════════════════════╝
+
+Master password changes only re-wrap the data-encryption key (DEK). This
+engine replaces the DEK itself, e.g. when it may have been exposed.
+
+A rotation first stores the new DEK, wrapped by the current one, in the
+rekey_state table. Credentials are then re-encrypted in id order, one batch
+per transaction, and each transaction also advances the checkpoint. Only the
+final step writes the new DEK into the master header.
+
+If the process dies part-way, the vault still unlocks with the same
+password. resume() then picks up after the last committed batch. Rows at or below the
+checkpoint are already under the new key; rows above it are still under the
+old one.
+
+Password fingerprints are keyed by the DEK, so each batch also stores the
+fingerprints under the new key.
+
+Rows that cannot be decrypted with the old key are unreadable either way.
+They are left untouched and counted rather than aborting the rotation.
+"""
+
+from typing import Callable, Optional
+
+from .database import VaultDatabase
+from .security import SecurityManager, KeyChange
+
+
+class RekeyEngine:
+    """Re-encrypts the vault under a new data key, resumably."""
+
+    BATCH_SIZE = 500
+
+    def __init__(self, db: VaultDatabase, security: SecurityManager, batch_size: int = BATCH_SIZE):
+        self.db = db
+        self.security = security
+        self.batch_size = batch_size
+
+    def pending(self) -> bool:
+        """Whether an interrupted rotation is waiting to be resumed."""
+        return self.db.get_rekey_state() is not None
+
+    def rotate_data_key(self, progress: Optional[Callable[[int, int], None]] = None) -> int:
+        """
+        Re-encrypt every credential under a fresh DEK. `progress(done,
+        total)` is called per batch. Returns the number re-encrypted.
+        """
+        if self.pending():
+            raise RuntimeError("A key rotation is already in progress")
+
+        change = self.security.prepare_data_key()
+        self.db.begin_rekey(
+            wrapped_key=self.security.wrap_key(change.key),
+            verifier=change.verifier,
+        )
+        return self.resume(progress)
+
+    def resume(self, progress: Optional[Callable[[int, int], None]] = None) -> int:
+        """
+        Finish an in-progress rotation; the session must be running on the
+        old DEK (or already on the new one, if only the cleanup was lost).
+        Returns the number of credentials re-encrypted.
+        """
+        state = self.db.get_rekey_state()
+        if state is None:
+            return 0
+
+        if self.security.is_session_key(state['verifier']):
+            # Crashed after the new header was written; nothing left to do
+            self.db.finish_rekey("Encryption key rotated (resumed)")
+            return 0
+
+        new_key = self.security.unwrap_key(state['wrapped_key'])
+        if new_key is None:
+            raise RuntimeError("Pending key rotation was not started with this key")
+
+        last_id, done, total = state['last_id'], state['done'], state['total']
+        reencrypted = skipped = 0
+        while True:
+            rows = self.db.get_ciphertext_batch(last_id, self.batch_size)
+            if not rows:
+                break
+            results = self.security.reencrypt_many(
+                (ciphertext for _, ciphertext in rows), new_key, strict=False, fingerprints=True
+            )
+            batch = []
+            for (cred_id, old), new in zip(rows, results):
+                if new is None:
+                    skipped += 1
+                    new = (old, None)
+                batch.append((cred_id, *new))
+            self.db.apply_rekey_batch(batch)
+
+            last_id = rows[-1][0]
+            done += len(rows)
+            reencrypted += len(rows)
+            if progress:
+                progress(done, max(total, done))
+
+        self.security.commit_key_change(KeyChange(key=new_key, verifier=state['verifier']))
+        details = f"Encryption key rotated; re-encrypted {done - skipped} credentials"
+        if skipped:
+            details += f" ({skipped} unreadable left as-is)"
+        self.db.finish_rekey(details)
+        return reencrypted - skipped
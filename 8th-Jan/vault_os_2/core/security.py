@@ -6,33 +6,89 @@
 """
 
 import hashlib
+import hmac
 import secrets
 import base64
+import json
+import os
 import time
 import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Iterable, Iterator, List, Callable, Union, Any
 from cryptography.fernet import Fernet, InvalidToken
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+from .kdf import (
+    KDFParams, LEGACY_PARAMS, DEFAULT_TARGET_MS, MASTER_NAMESPACE, BACKUP_NAMESPACE,
+    DerivedKeyCache, calibrate, derive_key
+)
+from .strength import StrengthBatch, default_analyzer
+
+
+# Stored ciphertext: a 0x01 format byte followed by the raw (binary) Fernet
+# token. Vaults before this format stored base64 text of the Fernet token,
+# which is itself base64, so the same bytes took ~78% more space.
+CIPHERTEXT_BINARY_V1 = b'\x01'
+
+Ciphertext = Union[bytes, str]
+
+
+def upgrade_legacy_ciphertext(value: str) -> bytes:
+    """Convert a legacy text ciphertext to the binary format; no key needed."""
+    token = base64.urlsafe_b64decode(value.encode())
+    return CIPHERTEXT_BINARY_V1 + base64.urlsafe_b64decode(token)
+
+
+def is_legacy_ciphertext(value: Ciphertext) -> bool:
+    return isinstance(value, str)
+
+
+@dataclass
+class KeyChange:
+    """A new data-encryption key that is not live yet (see core.rekey)."""
+    key: bytes     # urlsafe base64 Fernet key
+    verifier: str  # VERIFIER_PLAINTEXT encrypted with `key`
 
 
 class SecurityManager:
-    """Handles all security operations: hashing, encryption, session management."""
+    """
+    Handles all security operations: hashing, encryption, session management.
+    
+    Key hierarchy: credentials are encrypted with a random data-encryption
+    key (DEK). The header stores the DEK wrapped by the key-encryption key
+    (KEK) derived from the master password, so a password change only
+    re-wraps the DEK.
+    """
     
-    PBKDF2_ITERATIONS = 480000  # High iteration count for security
     SALT_SIZE = 32
+    HEADER_VERSION = 2
+    VERIFIER_PLAINTEXT = b'vault-os-key-check'
+    FINGERPRINT_CONTEXT = b'vault-os-password-fingerprint'
     AUTO_LOCK_TIMEOUT = 300  # 5 minutes default
+    BULK_CHUNK_SIZE = 512
+    BULK_WORKERS = min(8, os.cpu_count() or 1)
     
     def __init__(self, data_dir: Path):
         self.data_dir = data_dir
-        self.master_hash_file = data_dir / "master.hash"
-        self.salt_file = data_dir / "master.salt"
-        self._fernet: Optional[Fernet] = None
+        self.master_hash_file = data_dir / "master.hash"  # legacy SHA-512 vaults
+        self.salt_file = data_dir / "master.salt"  # legacy vaults; now kept in the header
+        self.header_file = data_dir / "master.kdf"
+        self.kdf_params: Optional[KDFParams] = None
+        self.kdf_target_ms: Optional[int] = None
+        self._fernet: Optional[Fernet] = None  # DEK: encrypts credentials
+        self._kek: Optional[Fernet] = None     # KEK: wraps the DEK
+        self._fingerprint_key: Optional[bytes] = None  # Derived from the DEK
         self._session_active = False
-        self._last_activity = time.time()
         self._lock_timeout = self.AUTO_LOCK_TIMEOUT
-        self._lock_timer: Optional[threading.Timer] = None
+        # Monotonic time at which the session auto-locks; activity just moves it
+        self._lock_deadline = 0.0
+        # Derived keys survive an auto-lock for one lock timeout
+        self.key_cache = DerivedKeyCache(ttl=self.AUTO_LOCK_TIMEOUT)
+        self._watchdog: Optional[threading.Thread] = None
+        self._watchdog_wake = threading.Event()
         self._on_lock_callback = None
         
     def set_lock_callback(self, callback):
@@ -42,152 +98,451 @@ class SecurityManager:
     def set_lock_timeout(self, seconds: int):
         """Set auto-lock timeout in seconds."""
         self._lock_timeout = max(60, seconds)  # Minimum 1 minute
+        self.key_cache.ttl = self._lock_timeout
         
-    def _derive_key(self, password: str, salt: bytes) -> bytes:
-        """Derive encryption key from password using PBKDF2."""
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=self.PBKDF2_ITERATIONS,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
-        return key
+    def _derive_key(self, password: str, salt: bytes, params: KDFParams,
+                    remember: bool = True, namespace: str = MASTER_NAMESPACE) -> bytes:
+        """
+        Derive the Fernet key from the password with the vault's KDF,
+        skipping the KDF when the key cache already holds it.
+        """
+        key = self.key_cache.get(password, salt, params, namespace)
+        if key is None:
+            key = derive_key(password, salt, params)
+            if remember:
+                self.key_cache.put(password, salt, params, key, namespace)
+        return base64.urlsafe_b64encode(key)
+    
+    def derive_backup_key(self, password: str, params: KDFParams,
+                          salt: Optional[bytes] = None) -> Tuple[bytes, bytes]:
+        """
+        Fernet key for an export/import password, through the key cache.
+        Without a salt, one already cached for this password is reused
+        (or a new one generated). Backup keys are cached apart from the
+        master key, so an export under the master password never reuses
+        the master salt. Returns (salt, key).
+        """
+        if salt is None:
+            salt = (self.key_cache.find_salt(password, params, BACKUP_NAMESPACE)
+                    or secrets.token_bytes(self.SALT_SIZE))
+        return salt, self._derive_key(password, salt, params, namespace=BACKUP_NAMESPACE)
     
     def _hash_password(self, password: str, salt: bytes) -> str:
-        """Hash password with salt using SHA-512."""
+        """Hash password with salt using SHA-512 (legacy vaults only)."""
         combined = salt + password.encode()
         return hashlib.sha512(combined).hexdigest()
     
+    def _read_header(self) -> dict:
+        """Read master.kdf and remember its KDF settings."""
+        header = json.loads(self.header_file.read_text())
+        self.kdf_target_ms = header.get('target_ms')
+        return header
+    
+    def _read_salt(self) -> bytes:
+        """The master password salt, stored in the header."""
+        return base64.b64decode(self._read_header()['salt'])
+    
+    def _write_header(self, salt: bytes, params: KDFParams, kek: Fernet, dek: bytes,
+                      target_ms: Optional[int] = None):
+        """
+        Store salt, KDF parameters and the DEK wrapped by the KEK.
+        Unwrapping the DEK checks a password with the same single KDF run
+        that produces the KEK.
+        
+        Everything is in the one file, replaced atomically and synced, so
+        a crash leaves either the old header or the new one: never a salt
+        from one password with the DEK wrapped under the other.
+        """
+        header = {
+            'version': self.HEADER_VERSION,
+            'salt': base64.b64encode(salt).decode(),
+            'kdf': params.to_dict(),
+            'target_ms': target_ms,
+            'wrapped_dek': kek.encrypt(dek).decode(),
+        }
+        
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.header_file.with_suffix(self.header_file.suffix + '.tmp')
+        with open(tmp, 'wb') as out:
+            out.write(json.dumps(header, indent=2).encode())
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp, self.header_file)
+        try:
+            dir_fd = os.open(self.data_dir, os.O_RDONLY)
+        except OSError:
+            pass  # Directories cannot be opened (Windows); the rename is still atomic
+        else:
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        
+        # Legacy files are only removed once the header is durable
+        for legacy in (self.master_hash_file, self.salt_file):
+            if legacy.exists():
+                legacy.unlink()
+    
+    def _unlock(self, password: str) -> Optional[Tuple[Fernet, bytes]]:
+        """
+        Derive the KEK once and unwrap the DEK with it. Returns (KEK, DEK)
+        if the password is right. Vaults from before the key hierarchy
+        encrypted credentials with the password key itself, so they are
+        upgraded with DEK = that key (no re-encryption needed).
+        """
+        if not self.header_file.exists():
+            # Legacy vault: check the SHA-512 hash, then upgrade to a header
+            salt = self.salt_file.read_bytes()
+            stored_hash = self.master_hash_file.read_text()
+            if not secrets.compare_digest(self._hash_password(password, salt), stored_hash):
+                return None
+            params = LEGACY_PARAMS
+            dek = self._derive_key(password, salt, params)
+            kek = Fernet(dek)
+            self._write_header(salt, params, kek, dek)
+        else:
+            # Only cache keys of verified passwords
+            header = self._read_header()
+            salt = base64.b64decode(header['salt'])
+            params = KDFParams.from_dict(header['kdf'])
+            key = self._derive_key(password, salt, params, remember=False)
+            kek = Fernet(key)
+            try:
+                dek = kek.decrypt(header['wrapped_dek'].encode())
+            except InvalidToken:
+                return None
+            self.key_cache.put(password, salt, params, base64.urlsafe_b64decode(key))
+        
+        self.kdf_params = params
+        return kek, dek
+    
     def is_vault_initialized(self) -> bool:
         """Check if master password has been set up."""
-        return self.master_hash_file.exists() and self.salt_file.exists()
+        return self.header_file.exists() or (self.master_hash_file.exists() and self.salt_file.exists())
     
-    def create_master_password(self, password: str) -> bool:
-        """Create and store master password hash."""
+    def create_master_password(self, password: str, params: Optional[KDFParams] = None,
+                               target_ms: int = DEFAULT_TARGET_MS) -> bool:
+        """
+        Create the vault header for a new master password and a fresh DEK.
+        Without explicit params the KDF is calibrated to take about
+        `target_ms` on this host.
+        """
         if len(password) < 8:
             raise ValueError("Password must be at least 8 characters")
         
-        # Generate salt
         salt = secrets.token_bytes(self.SALT_SIZE)
+        if params is None:
+            params = calibrate(target_ms=target_ms)
+        else:
+            target_ms = None
+        kek = Fernet(self._derive_key(password, salt, params))
+        dek = Fernet.generate_key()
         
-        # Hash password
-        password_hash = self._hash_password(password, salt)
-        
-        # Store salt and hash
-        self.data_dir.mkdir(parents=True, exist_ok=True)
-        self.salt_file.write_bytes(salt)
-        self.master_hash_file.write_text(password_hash)
+        self._write_header(salt, params, kek, dek, target_ms)
+        self.kdf_params = params
+        self.kdf_target_ms = target_ms
         
         # Initialize session
-        self._initialize_session(password, salt)
+        self._initialize_session(kek, dek)
         
         return True
     
     def verify_master_password(self, password: str) -> bool:
-        """Verify master password against stored hash."""
+        """Verify master password and unlock the session (one KDF run)."""
         if not self.is_vault_initialized():
             return False
         
-        salt = self.salt_file.read_bytes()
-        stored_hash = self.master_hash_file.read_text()
-        
-        computed_hash = self._hash_password(password, salt)
+        keys = self._unlock(password)
+        if keys is None:
+            return False
         
-        if secrets.compare_digest(computed_hash, stored_hash):
-            self._initialize_session(password, salt)
-            return True
-        return False
+        kek, dek = keys
+        self._initialize_session(kek, dek)
+        return True
     
-    def _initialize_session(self, password: str, salt: bytes):
+    def _initialize_session(self, kek: Fernet, dek: bytes):
         """Initialize an authenticated session."""
-        key = self._derive_key(password, salt)
-        self._fernet = Fernet(key)
+        # Deadline first, so the watchdog never sees an active session
+        # with a stale one
+        self._lock_deadline = time.monotonic() + self._lock_timeout
+        self._kek = kek
+        self._fernet = Fernet(dek)
+        self._fingerprint_key = self._fingerprint_key_for(dek)
         self._session_active = True
-        self._last_activity = time.time()
-        self._start_lock_timer()
+        self.key_cache.resume()
+        self._start_watchdog()
     
-    def _start_lock_timer(self):
-        """Start or reset the auto-lock timer."""
-        if self._lock_timer:
-            self._lock_timer.cancel()
-        
-        self._lock_timer = threading.Timer(self._lock_timeout, self._auto_lock)
-        self._lock_timer.daemon = True
-        self._lock_timer.start()
+    def _start_watchdog(self):
+        """Start the lock watchdog thread if needed and wake it."""
+        if self._watchdog is None or not self._watchdog.is_alive():
+            self._watchdog = threading.Thread(
+                target=self._watch, name='vault-lock-watchdog', daemon=True
+            )
+            self._watchdog.start()
+        self._watchdog_wake.set()
+    
+    def _watch(self):
+        """
+        Single long-lived thread that locks the session once the deadline
+        passes, and wipes cached keys when their grace period runs out.
+        Refreshes only move the deadline forward, so after waking the
+        watchdog just re-reads it and sleeps again if it moved.
+        """
+        while True:
+            if self._session_active:
+                remaining = self._lock_deadline - time.monotonic()
+                if remaining <= 0:
+                    self._auto_lock()
+                    continue
+            else:
+                self.key_cache.purge()
+                remaining = self.key_cache.expires_in()
+            
+            self._watchdog_wake.wait(remaining)
+            self._watchdog_wake.clear()
     
     def _auto_lock(self):
-        """Auto-lock the vault after inactivity."""
+        """
+        Auto-lock the vault after inactivity. The callback gets its own
+        thread: it usually prompts for the password and blocks, and the
+        watchdog must stay free to wipe the key cache when it expires.
+        """
         if self._session_active:
-            self.lock_vault()
+            self.lock_vault(wipe_keys=False)
             if self._on_lock_callback:
-                self._on_lock_callback()
+                threading.Thread(
+                    target=self._on_lock_callback, name='vault-lock-callback', daemon=True
+                ).start()
     
     def refresh_activity(self):
         """Refresh last activity time to prevent auto-lock."""
         if self._session_active:
-            self._last_activity = time.time()
-            self._start_lock_timer()
+            self._lock_deadline = time.monotonic() + self._lock_timeout
     
-    def lock_vault(self):
-        """Lock the vault and clear sensitive data."""
+    def lock_vault(self, wipe_keys: bool = True):
+        """
+        Lock the vault and clear sensitive data. Cached derived keys are
+        wiped too, unless `wipe_keys` is False (auto-lock), in which case
+        they expire after the key cache TTL.
+        """
         self._fernet = None
+        self._kek = None
+        self._fingerprint_key = None
         self._session_active = False
-        if self._lock_timer:
-            self._lock_timer.cancel()
-            self._lock_timer = None
+        if wipe_keys:
+            self.key_cache.wipe()
+        else:
+            self.key_cache.suspend()
+        self._watchdog_wake.set()
     
     def is_unlocked(self) -> bool:
         """Check if vault is currently unlocked."""
         return self._session_active and self._fernet is not None
     
-    def encrypt(self, plaintext: str) -> str:
+    @classmethod
+    def _fingerprint_key_for(cls, dek: bytes) -> bytes:
+        return hmac.new(dek, cls.FINGERPRINT_CONTEXT, hashlib.sha256).digest()
+    
+    @staticmethod
+    def _fingerprint_with(key: bytes, password: str) -> bytes:
+        return hmac.new(key, password.encode(), hashlib.sha256).digest()[:16]
+    
+    @staticmethod
+    def _encrypt_with(fernet: Fernet, plaintext: str) -> bytes:
+        token = fernet.encrypt(plaintext.encode())
+        return CIPHERTEXT_BINARY_V1 + base64.urlsafe_b64decode(token)
+    
+    @staticmethod
+    def _decrypt_with(fernet: Fernet, ciphertext: Ciphertext) -> str:
+        try:
+            if is_legacy_ciphertext(ciphertext):
+                token = base64.urlsafe_b64decode(ciphertext.encode())
+            elif ciphertext[:1] == CIPHERTEXT_BINARY_V1:
+                token = base64.urlsafe_b64encode(ciphertext[1:])
+            else:
+                raise ValueError("Unknown ciphertext format")
+            decrypted = fernet.decrypt(token)
+            return decrypted.decode()
+        except (InvalidToken, Exception):
+            raise ValueError("Decryption failed - data may be corrupted")
+    
+    def encrypt(self, plaintext: str) -> bytes:
         """Encrypt plaintext data."""
         if not self._fernet:
             raise RuntimeError("Vault is locked")
         self.refresh_activity()
-        encrypted = self._fernet.encrypt(plaintext.encode())
-        return base64.urlsafe_b64encode(encrypted).decode()
+        return self._encrypt_with(self._fernet, plaintext)
     
-    def decrypt(self, ciphertext: str) -> str:
+    def decrypt(self, ciphertext: Ciphertext) -> str:
         """Decrypt ciphertext data."""
         if not self._fernet:
             raise RuntimeError("Vault is locked")
         self.refresh_activity()
-        try:
-            encrypted = base64.urlsafe_b64decode(ciphertext.encode())
-            decrypted = self._fernet.decrypt(encrypted)
-            return decrypted.decode()
-        except (InvalidToken, Exception):
-            raise ValueError("Decryption failed - data may be corrupted")
+        return self._decrypt_with(self._fernet, ciphertext)
+    
+    def _bulk(self, func: Callable[[Fernet, Any], Any], items: Iterable[Any],
+              chunk_size: Optional[int], workers: Optional[int]) -> Iterator[List[Any]]:
+        """
+        Run `func` over `items` in chunks on a thread pool, yielding result
+        chunks in input order. At most two chunks per worker are in flight,
+        so memory stays bounded however many items there are. Activity is
+        refreshed once per chunk rather than once per item.
+        """
+        chunk_size = chunk_size or self.BULK_CHUNK_SIZE
+        workers = workers or self.BULK_WORKERS
+        items = iter(items)
+        
+        def run(fernet: Fernet, chunk: List[Any]) -> List[Any]:
+            return [func(fernet, item) for item in chunk]
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='vault-crypto') as pool:
+            pending = deque()
+            while True:
+                while len(pending) < workers * 2:
+                    chunk = list(islice(items, chunk_size))
+                    if not chunk:
+                        break
+                    if not self._fernet:
+                        raise RuntimeError("Vault is locked")
+                    pending.append(pool.submit(run, self._fernet, chunk))
+                if not pending:
+                    return
+                result = pending.popleft().result()
+                self.refresh_activity()
+                yield result
+    
+    def encrypt_many(self, plaintexts: Iterable[str], chunk_size: Optional[int] = None,
+                     workers: Optional[int] = None) -> Iterator[bytes]:
+        """Encrypt many values in parallel; yields ciphertexts in input order."""
+        for chunk in self._bulk(self._encrypt_with, plaintexts, chunk_size, workers):
+            yield from chunk
+    
+    def decrypt_many(self, ciphertexts: Iterable[Ciphertext], strict: bool = True,
+                     chunk_size: Optional[int] = None,
+                     workers: Optional[int] = None) -> Iterator[Optional[str]]:
+        """
+        Decrypt many values in parallel; yields plaintexts in input order.
+        With strict=False a value that fails to decrypt yields None instead
+        of raising ValueError.
+        """
+        func = self._decrypt_with
+        if not strict:
+            def func(fernet: Fernet, ciphertext: Ciphertext) -> Optional[str]:
+                try:
+                    return self._decrypt_with(fernet, ciphertext)
+                except ValueError:
+                    return None
+        
+        for chunk in self._bulk(func, ciphertexts, chunk_size, workers):
+            yield from chunk
     
     def change_master_password(self, old_password: str, new_password: str) -> bool:
-        """Change master password and re-encrypt all data."""
-        if not self.verify_master_password(old_password):
+        """
+        Change the master password: derive a new KEK and re-wrap the DEK.
+        Credentials are untouched, so this costs two KDF runs whatever
+        the vault size.
+        """
+        if not self.is_vault_initialized():
+            return False
+        
+        keys = self._unlock(old_password)
+        if keys is None:
             return False
         
         if len(new_password) < 8:
             raise ValueError("New password must be at least 8 characters")
         
-        # Generate new salt
+        # New salt, same KDF parameters
+        _, dek = keys
         new_salt = secrets.token_bytes(self.SALT_SIZE)
-        new_hash = self._hash_password(new_password, new_salt)
-        
-        # Store new credentials
-        self.salt_file.write_bytes(new_salt)
-        self.master_hash_file.write_text(new_hash)
+        kek = Fernet(self._derive_key(new_password, new_salt, self.kdf_params))
+        self._write_header(new_salt, self.kdf_params, kek, dek, self.kdf_target_ms)
         
-        # Re-initialize session with new password
-        self._initialize_session(new_password, new_salt)
+        # Re-initialize session with the new KEK
+        self._initialize_session(kek, dek)
         
         return True
     
+    def prepare_data_key(self) -> KeyChange:
+        """A fresh random DEK for a key rotation; not live until committed."""
+        key = Fernet.generate_key()
+        return KeyChange(key, Fernet(key).encrypt(self.VERIFIER_PLAINTEXT).decode())
+    
+    def commit_key_change(self, change: KeyChange):
+        """Make `change.key` the vault's DEK and switch the session to it."""
+        if not self._kek:
+            raise RuntimeError("Vault is locked")
+        
+        self._write_header(self._read_salt(), self.kdf_params, self._kek, change.key, self.kdf_target_ms)
+        self._initialize_session(self._kek, change.key)
+    
+    def fingerprint(self, password: str) -> bytes:
+        """
+        Keyed digest of a password for reuse detection. The key is derived
+        from the DEK, so fingerprints are useless without the vault key and
+        change when the DEK is rotated.
+        """
+        if not self._fingerprint_key:
+            raise RuntimeError("Vault is locked")
+        return self._fingerprint_with(self._fingerprint_key, password)
+    
+    def wrap_key(self, key: bytes) -> str:
+        """Encrypt a key with the session key (for storage during a re-key)."""
+        if not self._fernet:
+            raise RuntimeError("Vault is locked")
+        return self._fernet.encrypt(key).decode()
+    
+    def unwrap_key(self, wrapped: str) -> Optional[bytes]:
+        """Decrypt a wrapped key; None if it was not wrapped by the session key."""
+        if not self._fernet:
+            raise RuntimeError("Vault is locked")
+        try:
+            return self._fernet.decrypt(wrapped.encode())
+        except InvalidToken:
+            return None
+    
+    def is_session_key(self, verifier: str) -> bool:
+        """Whether `verifier` was produced by the key the session runs on."""
+        if not self._fernet:
+            return False
+        try:
+            return secrets.compare_digest(self._fernet.decrypt(verifier.encode()), self.VERIFIER_PLAINTEXT)
+        except InvalidToken:
+            return False
+    
+    def reencrypt_many(self, ciphertexts: Iterable[Ciphertext], new_key: bytes, strict: bool = True,
+                       chunk_size: Optional[int] = None, workers: Optional[int] = None,
+                       fingerprints: bool = False) -> Iterator[Any]:
+        """
+        Decrypt with the session key and encrypt with `new_key`, chunk by
+        chunk on the bulk engine; plaintexts never leave the worker. With
+        fingerprints=True each value is a (ciphertext, fingerprint under
+        `new_key`) pair. With strict=False values that fail to decrypt
+        yield None.
+        """
+        new_fernet = Fernet(new_key)
+        new_fingerprint_key = self._fingerprint_key_for(new_key) if fingerprints else None
+        
+        def reencrypt(fernet: Fernet, ciphertext: Ciphertext) -> Any:
+            try:
+                plaintext = self._decrypt_with(fernet, ciphertext)
+            except ValueError:
+                if strict:
+                    raise
+                return None
+            if new_fingerprint_key is not None:
+                return (self._encrypt_with(new_fernet, plaintext),
+                        self._fingerprint_with(new_fingerprint_key, plaintext))
+            return self._encrypt_with(new_fernet, plaintext)
+        
+        for chunk in self._bulk(reencrypt, ciphertexts, chunk_size, workers):
+            yield from chunk
+    
     def get_time_until_lock(self) -> int:
         """Get seconds until auto-lock."""
         if not self._session_active:
             return 0
-        elapsed = time.time() - self._last_activity
-        remaining = max(0, self._lock_timeout - elapsed)
+        remaining = max(0, self._lock_deadline - time.monotonic())
         return int(remaining)
 
 
@@ -248,59 +603,9 @@ class PasswordGenerator:
         Analyze password strength.
         Returns: (score 0-100, rating, list of issues)
         """
-        score = 0
-        issues = []
-        
-        # Length scoring
-        length = len(password)
-        if length >= 16:
-            score += 30
-        elif length >= 12:
-            score += 20
-        elif length >= 8:
-            score += 10
-        else:
-            issues.append("Too short (min 8 characters)")
-        
-        # Character diversity
-        has_lower = any(c.islower() for c in password)
-        has_upper = any(c.isupper() for c in password)
-        has_digit = any(c.isdigit() for c in password)
-        has_symbol = any(c in cls.SYMBOLS for c in password)
-        
-        diversity = sum([has_lower, has_upper, has_digit, has_symbol])
-        score += diversity * 15
-        
-        if not has_upper:
-            issues.append("Add uppercase letters")
-        if not has_digit:
-            issues.append("Add numbers")
-        if not has_symbol:
-            issues.append("Add special characters")
-        
-        # Pattern detection
-        common_patterns = ['123', 'abc', 'qwerty', 'password', 'admin']
-        if any(p in password.lower() for p in common_patterns):
-            score -= 20
-            issues.append("Contains common patterns")
-        
-        # Repeated characters
-        if any(password.count(c) > 3 for c in set(password)):
-            score -= 10
-            issues.append("Too many repeated characters")
-        
-        # Determine rating
-        score = max(0, min(100, score))
-        
-        if score >= 80:
-            rating = "Excellent"
-        elif score >= 60:
-            rating = "Good"
-        elif score >= 40:
-            rating = "Fair"
-        elif score >= 20:
-            rating = "Weak"
-        else:
-            rating = "Critical"
-        
-        return score, rating, issues
+        return default_analyzer().analyze(password)
+    
+    @classmethod
+    def analyze_many(cls, passwords: Iterable[str]) -> StrengthBatch:
+        """Analyze many passwords; scores, ratings and issues come back as arrays."""
+        return default_analyzer().analyze_many(passwords)
@@ -0,0 +1,262 @@
+"""
+╔═══════════════════════════════════════════════════════════════════════════════╗
+║                           STRENGTH MODULE                                     ║
+║              Single-Pass Password Strength Analysis                           ║
+╚═══════════════════════════════════════════════════════════════════════════════╝
+
+StrengthAnalyzer scores a password in one pass over its characters:
+
+- character classes come from a precomputed ASCII lookup table (other
+  characters are classified once and memoised);
+- common patterns are found by an Aho-Corasick automaton compiled to a
+  plain transition table, so every pattern is checked in the same pass;
+- repeats are counted as the pass goes instead of one count() per
+  distinct character.
+
+Results are cached in an LRU keyed by a keyed BLAKE2b digest of the
+password (the key is random per process), so repeated audits skip
+unchanged passwords without keeping them in memory. analyze_many() scores
+a batch into compact arrays.
+"""
+
+import hashlib
+import secrets
+import threading
+from array import array
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# Same set PasswordGenerator draws symbols from
+SYMBOLS = "!@#$%^&*()_+-=[]{}|;:,.<>?"
+COMMON_PATTERNS = ('123', 'abc', 'qwerty', 'password', 'admin')
+
+# Character class bits
+LOWER, UPPER, DIGIT, SYMBOL = 1, 2, 4, 8
+
+# Issue bits, in the order they are reported
+TOO_SHORT, NO_UPPER, NO_DIGIT, NO_SYMBOL, COMMON_PATTERN, REPEATED = 1, 2, 4, 8, 16, 32
+ISSUES = (
+    (TOO_SHORT, "Too short (min 8 characters)"),
+    (NO_UPPER, "Add uppercase letters"),
+    (NO_DIGIT, "Add numbers"),
+    (NO_SYMBOL, "Add special characters"),
+    (COMMON_PATTERN, "Contains common patterns"),
+    (REPEATED, "Too many repeated characters"),
+)
+
+# Lowest score for each rating, best first; index into RATINGS is the rating code
+RATINGS = ('Excellent', 'Good', 'Fair', 'Weak', 'Critical')
+_RATING_FLOORS = (80, 60, 40, 20, 0)
+
+# A character seen more often than this counts as repeated
+MAX_REPEATS = 3
+
+
+@lru_cache(maxsize=None)
+def _classify(char: str) -> int:
+    return ((LOWER if char.islower() else 0)
+            | (UPPER if char.isupper() else 0)
+            | (DIGIT if char.isdigit() else 0)
+            | (SYMBOL if char in SYMBOLS else 0))
+
+
+_ASCII_CLASSES = {chr(code): _classify(chr(code)) for code in range(128)}
+
+
+def rating_code(score: int) -> int:
+    """Index into RATINGS for a score."""
+    for code, floor in enumerate(_RATING_FLOORS):
+        if score >= floor:
+            return code
+    return len(RATINGS) - 1
+
+
+def rating_for(score: int) -> str:
+    return RATINGS[rating_code(score)]
+
+
+def describe_issues(flags: int) -> List[str]:
+    return [message for bit, message in ISSUES if flags & bit]
+
+
+class PatternMatcher:
+    """
+    Aho-Corasick automaton as a full transition table. Transitions on ASCII
+    letters exist in both cases, so ASCII text needs no lower() per step.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        goto: List[Dict[str, int]] = [{}]
+        terminal = [False]
+        for pattern in patterns:
+            state = 0
+            for char in pattern.lower():
+                if char not in goto[state]:
+                    goto.append({})
+                    terminal.append(False)
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            terminal[state] = True
+
+        # Breadth-first: a state's failure target is always complete before
+        # it, so its transitions are the failure state's plus its own
+        self.transitions: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            terminal[state] = terminal[state] or terminal[fail[state]]
+            self.transitions[state] = {**self.transitions[fail[state]], **goto[state]}
+            for char, child in goto[state].items():
+                fail[child] = self.transitions[fail[state]].get(char, 0) if state else 0
+                queue.append(child)
+        for transitions in self.transitions:
+            transitions.update({char.upper(): state for char, state in transitions.items()
+                                if char.isascii() and char.isalpha()})
+        self.terminal = terminal
+
+    def search(self, text: str) -> bool:
+        """Whether any pattern occurs in `text` (case-insensitive)."""
+        transitions, terminal = self.transitions, self.terminal
+        state = 0
+        for char in text.lower():
+            state = transitions[state].get(char, 0)
+            if terminal[state]:
+                return True
+        return False
+
+
+@dataclass
+class StrengthBatch:
+    """Results of analyze_many(), one array slot per input password."""
+    scores: array   # 'B': 0-100
+    ratings: array  # 'B': index into RATINGS
+    issues: array   # 'B': ISSUES bit flags
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def rating(self, index: int) -> str:
+        return RATINGS[self.ratings[index]]
+
+    def issue_list(self, index: int) -> List[str]:
+        return describe_issues(self.issues[index])
+
+
+class StrengthAnalyzer:
+    """Scores passwords 0-100 with a rating and the issues found."""
+
+    CACHE_SIZE = 4096
+
+    def __init__(self, patterns: Sequence[str] = COMMON_PATTERNS, cache_size: int = CACHE_SIZE):
+        self.matcher = PatternMatcher(patterns)
+        self.cache_size = cache_size
+        self._cache_key = secrets.token_bytes(32)
+        self._cache: 'OrderedDict[bytes, Tuple[int, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _score(self, password: str) -> Tuple[int, int]:
+        """(score, issue flags) in a single pass."""
+        transitions, terminal = self.matcher.transitions, self.matcher.terminal
+        ascii_class = _ASCII_CLASSES.get
+        classes = 0
+        state = 0
+        pattern = False
+        repeated = False
+        counts: Dict[str, int] = {}
+
+        for char in password:
+            char_class = ascii_class(char)
+            if char_class is not None:
+                classes |= char_class
+                if not pattern:
+                    state = transitions[state].get(char, 0)
+                    pattern = terminal[state]
+            else:
+                classes |= _classify(char)
+                if not pattern:
+                    for low in char.lower():  # lower() can expand a character
+                        state = transitions[state].get(low, 0)
+                        if terminal[state]:
+                            pattern = True
+                            break
+            if not repeated:
+                count = counts.get(char, 0) + 1
+                counts[char] = count
+                repeated = count > MAX_REPEATS
+
+        length = len(password)
+        flags = 0
+        if length >= 16:
+            score = 30
+        elif length >= 12:
+            score = 20
+        elif length >= 8:
+            score = 10
+        else:
+            score = 0
+            flags |= TOO_SHORT
+
+        score += 15 * bin(classes).count('1')
+        if not classes & UPPER:
+            flags |= NO_UPPER
+        if not classes & DIGIT:
+            flags |= NO_DIGIT
+        if not classes & SYMBOL:
+            flags |= NO_SYMBOL
+        if pattern:
+            score -= 20
+            flags |= COMMON_PATTERN
+        if repeated:
+            score -= 10
+            flags |= REPEATED
+
+        return max(0, min(100, score)), flags
+
+    def _digest(self, password: str) -> bytes:
+        return hashlib.blake2b(password.encode('utf-8', 'surrogatepass'), key=self._cache_key, digest_size=16).digest()
+
+    def _lookup(self, password: str) -> Tuple[int, int]:
+        if not self.cache_size:
+            return self._score(password)
+        digest = self._digest(password)
+        with self._lock:
+            result = self._cache.get(digest)
+            if result is not None:
+                self._cache.move_to_end(digest)
+                return result
+        result = self._score(password)
+        with self._lock:
+            self._cache[digest] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def analyze(self, password: str) -> Tuple[int, str, List[str]]:
+        """(score 0-100, rating, list of issues)."""
+        score, flags = self._lookup(password)
+        return score, rating_for(score), describe_issues(flags)
+
+    def analyze_many(self, passwords: Iterable[str]) -> StrengthBatch:
+        """Score many passwords into arrays, in input order."""
+        scores, ratings, issues = array('B'), array('B'), array('B')
+        for password in passwords:
+            score, flags = self._lookup(password)
+            scores.append(score)
+            ratings.append(rating_code(score))
+            issues.append(flags)
+        return StrengthBatch(scores, ratings, issues)
+
+
+_default: Optional[StrengthAnalyzer] = None
+
+
+def default_analyzer() -> StrengthAnalyzer:
+    """The shared analyzer behind PasswordGenerator.analyze_strength()."""
+    global _default
+    if _default is None:
+        _default = StrengthAnalyzer()
+    return _default
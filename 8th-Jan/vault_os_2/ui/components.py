@@ -8,6 +8,9 @@
 import os
 import time
 import random
+import signal
+import threading
+from contextlib import contextmanager
 from typing import List, Optional, Tuple, Callable, Any
 from rich.console import Console
 from rich.panel import Panel
@@ -81,6 +84,42 @@ class VaultConsole:
         if show_fact:
             self.print(f"\n[{self.theme.muted}]{random.choice(FUN_FACTS)}[/]\n")
     
+    @contextmanager
+    def progress_bar(self, message: str, total: int):
+        """
+        Determinate progress bar; yields a callable that sets (completed,
+        total) and optionally a `detail` text shown after the bar.
+        """
+        with Progress(SpinnerColumn("dots12", style=f"bold {self.theme.primary}"),
+                     TextColumn(f"[{self.theme.secondary}]{message}"),
+                     BarColumn(complete_style=self.theme.primary), TaskProgressColumn(),
+                     TextColumn(f"[{self.theme.muted}]{{task.fields[detail]}}"),
+                     console=self.console, transient=True) as progress:
+            task = progress.add_task("", total=total, detail="")
+            
+            def update(completed: int, total: int = total, detail: Optional[str] = None):
+                fields = {} if detail is None else {'detail': detail}
+                progress.update(task, completed=completed, total=total, **fields)
+            
+            yield update
+    
+    @contextmanager
+    def cancel_on_interrupt(self):
+        """
+        Turn Ctrl+C into a cancel request instead of an exit while the block
+        runs; yields the threading.Event it sets.
+        """
+        cancel = threading.Event()
+        try:
+            previous = signal.signal(signal.SIGINT, lambda sig, frame: cancel.set())
+        except ValueError:
+            previous = None  # Not the main thread: Ctrl+C keeps its usual meaning
+        try:
+            yield cancel
+        finally:
+            if previous is not None:
+                signal.signal(signal.SIGINT, previous)
+    
     def show_spinner(self, message: str, duration: float = 1.0):
         with self.console.status(f"[{self.theme.secondary}]{message}", spinner="dots12",
                                 spinner_style=f"bold {self.theme.primary}"):
@@ -33,17 +33,18 @@ class DashboardScreen:
         """Render dashboard and return user action."""
         self.console.clear()
         
+        stats = self.db.get_statistics()
+        
         # Status bar
         status = StatusBar(self.console)
         self.console.print(status.render(
             vault_status="Unlocked" if self.security.is_unlocked() else "Locked",
-            credential_count=self.db.get_credential_count(),
+            credential_count=stats['total_credentials'],
             time_to_lock=self.security.get_time_until_lock(),
             current_screen="Dashboard"
         ))
         
         # Stats cards
-        stats = self.db.get_statistics()
         self._render_stats_cards(stats)
         
         # Recent activity
@@ -134,25 +135,66 @@ class DashboardScreen:
 class CredentialsScreen:
     """Credential management screen."""
     
+    PAGE_SIZE = 20
+    
     def __init__(self, console: VaultConsole, db: VaultDatabase, security: SecurityManager):
         self.console = console
         self.db = db
         self.security = security
         self.theme = console.theme
+        self.reset_pagination()
+    
+    def reset_pagination(self):
+        """Return the list view to the first page."""
+        self._page_number = 1
+        self._page_after = None     # (website, id) the current page starts after
+        self._page_before = None    # (website, id) the current page ends before
+        self._first_key = None
+        self._last_key = None
+    
+    def _load_page(self) -> tuple:
+        """Fetch one page with keyset pagination; returns (rows, has_prev, has_next)."""
+        rows = list(self.db.iter_credentials(
+            after=self._page_after,
+            before=self._page_before,
+            limit=self.PAGE_SIZE + 1,
+            lazy=True
+        ))
+        
+        if self._page_before is not None:
+            # Walking backwards: the extra row sits at the front
+            has_prev = len(rows) > self.PAGE_SIZE
+            rows = rows[-self.PAGE_SIZE:]
+            has_next = True
+        else:
+            has_prev = self._page_after is not None
+            has_next = len(rows) > self.PAGE_SIZE
+            rows = rows[:self.PAGE_SIZE]
+        
+        if rows:
+            self._first_key = (rows[0].website, rows[0].id)
+            self._last_key = (rows[-1].website, rows[-1].id)
+        return rows, has_prev, has_next
     
     def list_credentials(self, search_query: str = None):
-        """Display list of all credentials."""
+        """Display credentials one page at a time, or all search matches."""
         self.console.clear()
-        self.console.show_header(f"{ICONS['vault']} Credential Vault", 
-                                 f"Search: '{search_query}'" if search_query else "All credentials")
         
+        has_prev = has_next = False
         if search_query:
-            credentials = self.db.search_credentials(search_query)
+            subtitle = f"Search: '{search_query}'"
+            credentials = self.db.search_credentials(search_query, lazy=True)
         else:
-            credentials = self.db.get_all_credentials()
+            credentials, has_prev, has_next = self._load_page()
+            subtitle = f"All credentials - Page {self._page_number}"
+        
+        self.console.show_header(f"{ICONS['vault']} Credential Vault", subtitle)
         
         if not credentials:
             self.console.show_info("No credentials found.")
+            if self._page_number > 1:
+                # Rows vanished under the cursor (e.g. deleted); start over
+                self.reset_pagination()
             return None
         
         # Create table
@@ -178,6 +220,10 @@ class CredentialsScreen:
         
         # Options
         self.console.print(f"  [{self.theme.primary}][#][/] View credential by number")
+        if has_next:
+            self.console.print(f"  [{self.theme.primary}][N][/] Next page")
+        if has_prev:
+            self.console.print(f"  [{self.theme.primary}][P][/] Previous page")
         self.console.print(f"  [{self.theme.primary}][S][/] {ICONS['search']} Search")
         self.console.print(f"  [{self.theme.error}][B][/] Back to Dashboard")
         self.console.print()
@@ -189,6 +235,12 @@ class CredentialsScreen:
         elif choice == 's':
             query = self.console.prompt("Search query")
             return ('search', query)
+        elif choice == 'n' and has_next:
+            self._page_after, self._page_before = self._last_key, None
+            self._page_number += 1
+        elif choice == 'p' and has_prev:
+            self._page_after, self._page_before = None, self._first_key
+            self._page_number -= 1
         else:
             try:
                 idx = int(choice) - 1
@@ -292,6 +344,9 @@ class CredentialsScreen:
             self.console.show_error("Password is required")
             return None
         
+        fingerprint = self.security.fingerprint(password)
+        self._warn_reuse(fingerprint)
+        
         # Category selection
         categories = self.db.get_categories()
         cat_names = [c['name'] for c in categories]
@@ -321,7 +376,8 @@ class CredentialsScreen:
             created_at=datetime.now().isoformat(),
             last_updated=datetime.now().isoformat(),
             last_accessed=None,
-            access_count=0
+            access_count=0,
+            password_fingerprint=fingerprint
         )
         
         try:
@@ -332,6 +388,15 @@ class CredentialsScreen:
             self.console.show_error(f"Failed to save: {str(e)}")
             return None
     
+    def _warn_reuse(self, fingerprint: bytes, exclude_id: Optional[int] = None):
+        """Warn if the password is already stored for other sites (no decryption needed)."""
+        sites = self.db.get_sites_using_password(fingerprint, exclude_id)
+        if sites:
+            shown = ', '.join(sites[:3]) + (f" and {len(sites) - 3} more" if len(sites) > 3 else "")
+            self.console.show_warning(
+                f"This password is already used on {len(sites)} site{'s' if len(sites) != 1 else ''}: {shown}"
+            )
+    
     def edit_credential(self, credential: Credential) -> bool:
         """Edit an existing credential."""
         self.console.clear()
@@ -346,6 +411,8 @@ class CredentialsScreen:
             password = self.console.prompt(f"{ICONS['password']} New password", password=True)
             if password:
                 encrypted_pw = self.security.encrypt(password)
+                credential.password_fingerprint = self.security.fingerprint(password)
+                self._warn_reuse(credential.password_fingerprint, exclude_id=credential.id)
             else:
                 encrypted_pw = credential.encrypted_password
         else:
@@ -5,7 +5,11 @@
 ╚═══════════════════════════════════════════════════════════════════════════════╝
 """
 
-from typing import List, Dict, Any
+import os
+import time
+import tempfile
+from pathlib import Path
+from typing import Optional
 from rich.table import Table
 from rich.text import Text
 from rich.panel import Panel
@@ -16,6 +20,8 @@ from .components import VaultConsole, MenuSelector, ConfirmationModal
 from .themes import ICONS, THEMES, STRENGTH_COLORS, STRENGTH_BARS
 from ..core.database import VaultDatabase
 from ..core.security import SecurityManager, PasswordGenerator
+from ..core.rekey import RekeyEngine
+from ..core.audit import VaultAuditor, AuditReport
 
 
 class PasswordGeneratorScreen:
@@ -108,10 +114,12 @@ class PasswordGeneratorScreen:
 class SecurityAuditScreen:
     """Security audit and analysis."""
     
-    def __init__(self, console: VaultConsole, db: VaultDatabase, security: SecurityManager):
+    def __init__(self, console: VaultConsole, db: VaultDatabase, security: SecurityManager,
+                 breach_index_path: Optional[Path] = None):
         self.console = console
         self.db = db
         self.security = security
+        self.breach_index_path = breach_index_path
         self.theme = console.theme
     
     def render(self):
@@ -119,83 +127,48 @@ class SecurityAuditScreen:
         self.console.clear()
         self.console.show_header(f"{ICONS['audit']} Security Audit", "Analyzing vault security...")
         
-        self.console.show_spinner("Scanning credentials...", 1.0)
-        
-        credentials = self.db.get_all_credentials()
-        
-        if not credentials:
+        total = self.db.get_credential_count()
+        if not total:
             self.console.show_info("No credentials to audit")
             self.console.wait_for_key()
             return
         
-        audit_results = self._analyze_credentials(credentials)
-        self._display_audit_results(audit_results)
+        report = self._analyze_credentials(total)
+        self._display_audit_results(report)
         
         self.console.wait_for_key()
     
-    def _analyze_credentials(self, credentials) -> Dict[str, Any]:
-        """Analyze all credentials for security issues."""
-        results = {
-            'total': len(credentials),
-            'weak_passwords': [],
-            'reused_passwords': [],
-            'old_passwords': [],
-            'strength_distribution': {'Critical': 0, 'Weak': 0, 'Fair': 0, 'Good': 0, 'Excellent': 0}
-        }
-        
-        password_hashes = {}
-        
-        for cred in credentials:
-            try:
-                password = self.security.decrypt(cred.encrypted_password)
-                score, rating, issues = PasswordGenerator.analyze_strength(password)
-                
-                results['strength_distribution'][rating] += 1
-                
-                if score < 40:
-                    results['weak_passwords'].append({
-                        'website': cred.website,
-                        'username': cred.username,
-                        'score': score,
-                        'rating': rating
-                    })
-                
-                # Check for reuse
-                import hashlib
-                pw_hash = hashlib.sha256(password.encode()).hexdigest()
-                if pw_hash in password_hashes:
-                    password_hashes[pw_hash].append(cred.website)
-                else:
-                    password_hashes[pw_hash] = [cred.website]
-                
-                # Check age (>90 days)
-                from datetime import datetime, timedelta
-                last_updated = datetime.fromisoformat(cred.last_updated.replace('Z', '+00:00'))
-                if datetime.now(last_updated.tzinfo) - last_updated > timedelta(days=90):
-                    results['old_passwords'].append({
-                        'website': cred.website,
-                        'age_days': (datetime.now(last_updated.tzinfo) - last_updated).days
-                    })
-            except:
-                continue
-        
-        # Find reused passwords
-        for pw_hash, sites in password_hashes.items():
-            if len(sites) > 1:
-                results['reused_passwords'].append(sites)
-        
-        return results
+    def _analyze_credentials(self, total: int) -> AuditReport:
+        """
+        Audit page by page with a live progress bar and running findings.
+        Ctrl+C stops after the current page with the results so far.
+        """
+        # Only new or changed credentials are decrypted; the rest come from the audit cache
+        auditor = VaultAuditor(self.db, self.security, self.breach_index_path)
+        self.console.print(f"[{self.theme.muted}]Press Ctrl+C to stop early[/]")
+        
+        report = AuditReport(total=total)
+        start = time.perf_counter()
+        with self.console.cancel_on_interrupt() as cancel, \
+                self.console.progress_bar("Auditing credentials", total) as update:
+            for report in auditor.audit(cancel):
+                done = report.checked + report.unreadable
+                rate = done / max(time.perf_counter() - start, 1e-6)
+                update(done, max(report.total, done),
+                       detail=f"{report.weak_count} weak · {report.breached_count} breached · {rate:,.0f}/s")
+        return report
     
-    def _display_audit_results(self, results: Dict[str, Any]):
+    def _display_audit_results(self, report: AuditReport):
         """Display audit results."""
         # Health score
-        total = results['total']
-        weak_count = len(results['weak_passwords'])
-        reused_count = sum(len(sites) for sites in results['reused_passwords'])
-        
-        health_score = max(0, 100 - (weak_count * 10) - (reused_count * 5))
+        health_score = max(0, 100 - (report.weak_count * 10) - (report.reused_count * 5)
+                           - (report.breached_count * 15))
         
         self.console.print()
+        if not report.complete:
+            self.console.show_warning(
+                f"Audit stopped early: results cover {report.checked:,} of {report.total:,} credentials"
+            )
         
         # Health score panel
         health_color = 'green' if health_score >= 80 else 'yellow' if health_score >= 50 else 'red'
@@ -209,7 +182,8 @@ class SecurityAuditScreen:
         # Strength distribution
         self.console.show_divider("Password Strength Distribution")
         
-        dist = results['strength_distribution']
+        total = report.checked
+        dist = report.strength_distribution
         for rating in ['Excellent', 'Good', 'Fair', 'Weak', 'Critical']:
             count = dist[rating]
             bar_len = int((count / max(total, 1)) * 20)
@@ -218,23 +192,43 @@ class SecurityAuditScreen:
             self.console.print(f"  [{color}]{rating:10}[/] [{color}]{bar}[/] {count}/{total}")
         
         # Issues
-        if results['weak_passwords']:
+        if report.breached_count:
+            self.console.print()
+            self.console.show_divider(f"{ICONS['error']} Breached Passwords")
+            for item in report.breached_passwords[:5]:
+                self.console.print(f"  [{self.theme.error}]•[/] {item['website']} ({item['username']})")
+            if report.breached_count > 5:
+                self.console.print(f"  [{self.theme.muted}]...and {report.breached_count - 5} more[/]")
+        
+        if report.weak_count:
             self.console.print()
             self.console.show_divider(f"{ICONS['warning']} Weak Passwords")
-            for item in results['weak_passwords'][:5]:
+            for item in report.weak_passwords[:5]:
                 self.console.print(f"  [{self.theme.error}]•[/] {item['website']} ({item['rating']})")
+            if report.weak_count > 5:
+                self.console.print(f"  [{self.theme.muted}]...and {report.weak_count - 5} more[/]")
         
-        if results['reused_passwords']:
+        if report.reused_passwords:
             self.console.print()
             self.console.show_divider(f"{ICONS['error']} Reused Passwords")
-            for sites in results['reused_passwords'][:5]:
+            for sites in report.reused_passwords[:5]:
                 self.console.print(f"  [{self.theme.error}]•[/] {', '.join(sites)}")
         
-        if results['old_passwords']:
+        if report.old_count:
             self.console.print()
             self.console.show_divider(f"{ICONS['clock']} Old Passwords (>90 days)")
-            for item in results['old_passwords'][:5]:
+            for item in report.old_passwords[:5]:
                 self.console.print(f"  [{self.theme.warning}]•[/] {item['website']} ({item['age_days']} days)")
+            if report.old_count > 5:
+                self.console.print(f"  [{self.theme.muted}]...and {report.old_count - 5} more[/]")
+        
+        self.console.print()
+        if report.unreadable:
+            self.console.print(f"  [{self.theme.warning}]{report.unreadable:,} credentials could not be decrypted and were skipped[/]")
+        if report.breach_index_size:
+            self.console.print(f"  [{self.theme.muted}]Checked against {report.breach_index_size:,} breached passwords (offline)[/]")
+        else:
+            self.console.print(f"  [{self.theme.muted}]No breach list installed; build one with vault_tools.py build-breach-index[/]")
 
 
 class SettingsScreen:
@@ -261,6 +255,8 @@ class SettingsScreen:
             self.console.print(f"  [{self.theme.primary}][4][/] {ICONS['export']} Export Vault")
             self.console.print(f"  [{self.theme.primary}][5][/] {ICONS['import']} Import Vault")
             self.console.print(f"  [{self.theme.primary}][6][/] {ICONS['chart']} View Activity Logs")
+            self.console.print(f"  [{self.theme.primary}][7][/] {ICONS['time']} Activity Log Retention")
+            self.console.print(f"  [{self.theme.primary}][8][/] {ICONS['shield']} Rotate Encryption Key")
             self.console.print(f"\n  [{self.theme.error}][B][/] Back")
             
             choice = self.console.prompt("Option").strip().lower()
@@ -279,6 +275,10 @@ class SettingsScreen:
                 self._import_vault()
             elif choice == '6':
                 self._view_activity_logs()
+            elif choice == '7':
+                self._change_log_retention()
+            elif choice == '8':
+                self._rotate_data_key()
     
     def _change_theme(self):
         """Change application theme."""
@@ -316,27 +316,33 @@ class SettingsScreen:
             self.console.show_error("Passwords don't match")
             return
         
-        # Re-encrypt all credentials
-        credentials = self.db.get_all_credentials()
-        decrypted_passwords = {}
-        
-        for cred in credentials:
-            try:
-                decrypted_passwords[cred.id] = self.security.decrypt(cred.encrypted_password)
-            except:
-                self.console.show_error("Failed to decrypt credentials")
-                return
+        # Only the wrapped data key changes; credentials stay as they are
+        try:
+            changed = self.security.change_master_password(old_pw, new_pw)
+        except ValueError as e:
+            self.console.show_error(str(e))
+            return
         
-        if self.security.change_master_password(old_pw, new_pw):
-            # Re-encrypt all passwords
-            for cred in credentials:
-                cred.encrypted_password = self.security.encrypt(decrypted_passwords[cred.id])
-                self.db.update_credential(cred)
-            
+        if changed:
             self.console.show_success("Master password changed successfully!")
         else:
             self.console.show_error("Failed to change password")
     
+    def _rotate_data_key(self):
+        """Re-encrypt every credential under a new data key."""
+        if not self.console.confirm("Re-encrypt all credentials with a new encryption key?"):
+            return
+        
+        engine = RekeyEngine(self.db, self.security)
+        try:
+            with self.console.progress_bar("Re-encrypting credentials", self.db.get_credential_count()) as update:
+                count = engine.rotate_data_key(progress=update)
+        except RuntimeError as e:
+            self.console.show_error(str(e))
+            return
+        
+        self.console.show_success(f"Encryption key rotated ({count} credentials re-encrypted)")
+    
     def _export_vault(self):
         """Export vault to encrypted file."""
         export_pw = self.console.prompt("Export password", password=True)
@@ -346,39 +352,71 @@ class SettingsScreen:
             self.console.show_error("Passwords don't match")
             return
         
+        filename = f"vault_export_{self.console.prompt('Filename', default='backup')}.vault"
+        
+        export_path = Path.cwd() / filename
+        
+        # Write beside the target and swap it in only when complete, so a
+        # failed export never damages an existing backup of the same name
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{filename}.", suffix='.tmp', dir=export_path.parent)
+        tmp_path = Path(tmp_name)
         try:
-            encrypted_data = self.db.export_vault(self.security, export_pw)
-            
-            filename = f"vault_export_{self.console.prompt('Filename', default='backup')}.vault"
+            with os.fdopen(fd, 'wb') as out:
+                count = self.db.export_vault(self.security, export_pw, out)
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp_path, export_path)
             
-            from pathlib import Path
-            export_path = Path.cwd() / filename
-            export_path.write_text(encrypted_data)
-            
-            self.console.show_success(f"Vault exported to {filename}")
+            self.console.show_success(f"Exported {count} credentials to {filename}")
         except Exception as e:
+            tmp_path.unlink(missing_ok=True)
             self.console.show_error(f"Export failed: {str(e)}")
     
     def _import_vault(self):
         """Import vault from encrypted file."""
         filename = self.console.prompt("Import filename (without .vault)")
         import_pw = self.console.prompt("Import password", password=True)
+        on_conflict = (self.db.IMPORT_UPDATE
+                       if self.console.confirm("Overwrite entries that already exist?")
+                       else self.db.IMPORT_SKIP)
         
         try:
-            from pathlib import Path
             import_path = Path.cwd() / f"{filename}.vault"
             
             if not import_path.exists():
                 self.console.show_error("File not found")
                 return
             
-            encrypted_data = import_path.read_text()
-            count = self.db.import_vault(self.security, encrypted_data, import_pw)
+            with open(import_path, 'rb') as source:
+                report = self.db.import_vault(self.security, source, import_pw, on_conflict)
             
-            self.console.show_success(f"Imported {count} credentials")
+            self.console.show_success(f"Import complete: {report.summary()}")
+            for entry, reason in report.failed[:10]:
+                self.console.show_warning(f"Not imported: {entry} - {reason}")
+            if len(report.failed) > 10:
+                self.console.show_warning(f"...and {len(report.failed) - 10} more")
         except Exception as e:
             self.console.show_error(f"Import failed: {str(e)}")
     
+    def _change_log_retention(self):
+        """Configure activity log retention and compact now."""
+        days = self.db.get_setting('log_retention_days', str(self.db.DEFAULT_LOG_RETENTION_DAYS))
+        rows = self.db.get_setting('log_max_rows', str(self.db.DEFAULT_LOG_MAX_ROWS))
+        
+        try:
+            days = max(1, int(self.console.prompt("Keep logs for (days)", default=days)))
+            rows = max(100, int(self.console.prompt("Keep at most (entries)", default=rows)))
+        except ValueError:
+            self.console.show_error("Invalid input")
+            return
+        
+        self.db.set_setting('log_retention_days', str(days))
+        self.db.set_setting('log_max_rows', str(rows))
+        
+        archived = self.db.run_log_retention(force=True)
+        self.console.show_success(f"Retention set to {days} days / {rows} entries. "
+                                  f"Archived {archived} old entries.")
+    
     def _view_activity_logs(self):
         """View activity logs."""
         self.console.clear()
@@ -0,0 +1,1164 @@
+#!/usr/bin/env python3
+"""
+╔═══════════════════════════════════════════════════════════════════════════════╗
+║                              VAULT OS 2.0                                     ║
+║                     Benchmarks and Maintenance Tools                          ║
+╚═══════════════════════════════════════════════════════════════════════════════╝
+
+Usage:
+    python vault_tools.py bench-pragmas [--count 10000]
+    python vault_tools.py check-plans [--count 5000]
+    python vault_tools.py bench-search [--count 100000]
+    python vault_tools.py bench-rows [--count 50000]
+    python vault_tools.py bench-dashboard [--count 100000]
+    python vault_tools.py bench-unlock [--count 1000] [--target-ms 500] [--kdf NAME]
+    python vault_tools.py bench-crypto [--count 50000]
+    python vault_tools.py bench-storage [--count 20000]
+    python vault_tools.py bench-backup [--count 20000]
+    python vault_tools.py bench-strength [--count 100000]
+    python vault_tools.py build-breach-index LIST [LIST ...] [--output PATH]
+    python vault_tools.py bench-breach [--count 2000000]
+    python vault_tools.py bench-audit [--count 50000]
+    python vault_tools.py stress-autolock [--count 10000]
+    python vault_tools.py stress-lock-callback [--ttl 0.5]
+
+Benchmarks run against throwaway vaults in a temporary directory and never
+touch ~/.vault_os. build-breach-index writes ~/.vault_os/breached.idx unless
+--output is given.
+"""
+
+import io
+import sys
+import os
+import re
+import time
+import secrets
+import base64
+import argparse
+import tempfile
+import threading
+import tracemalloc
+from pathlib import Path
+from dataclasses import dataclass
+from statistics import mean, quantiles
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from vault_os_2.core.database import VaultDatabase, Credential, ConnectionProfile
+from vault_os_2.core.security import SecurityManager, PasswordGenerator, CIPHERTEXT_BINARY_V1
+from vault_os_2.core import kdf
+from vault_os_2.core.strength import StrengthAnalyzer
+from vault_os_2.core import breach
+from vault_os_2.core.backup import BackupHeader, BackupWriter, read_header
+from vault_os_2.core.audit import VaultAuditor
+
+
+CATEGORIES = ['General', 'Social Media', 'Finance', 'Work', 'Gaming', 'Shopping']
+
+# Plain SQLite defaults: rollback journal, fsync on every commit
+LEGACY_PROFILE = ConnectionProfile(
+    journal_mode='DELETE',
+    synchronous='FULL',
+    mmap_size=0,
+    cache_size=-2000,
+    temp_store='DEFAULT',
+)
+
+
+def make_credential(i: int) -> Credential:
+    """Build a synthetic credential with a realistic ciphertext size."""
+    return Credential(
+        id=None,
+        website=f"site-{i:07d}.example.com",
+        username=f"user{i}@example.com",
+        encrypted_password=CIPHERTEXT_BINARY_V1 + secrets.token_bytes(89),  # 16-char password
+        notes="" if i % 3 else f"Recovery codes stored offline #{i}",
+        category=CATEGORIES[i % len(CATEGORIES)],
+        created_at="",
+        last_updated="",
+        last_accessed=None,
+        access_count=0
+    )
+
+
+def seed_vault(db: VaultDatabase, count: int, start: int = 0):
+    """Fill a vault with synthetic credentials in one transaction."""
+    db.add_credentials(make_credential(i) for i in range(start, start + count))
+
+
+def print_row(label: str, *values):
+    print(f"  {label:<28}" + "".join(f"{v:>16}" for v in values))
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# bench-pragmas
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _measure_commits(db: VaultDatabase, samples: int, offset: int) -> list:
+    latencies = []
+    for i in range(samples):
+        start = time.perf_counter()
+        db.add_credential(make_credential(offset + i))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def _measure_concurrency(db_path: Path, profile: ConnectionProfile, offset: int,
+                         readers: int, duration: float) -> tuple:
+    """Run one writer and several readers; return (writes/s, reads/s, reader errors)."""
+    stop = threading.Event()
+    counts = {'writes': 0, 'reads': 0, 'errors': 0}
+    lock = threading.Lock()
+
+    def writer():
+        db = VaultDatabase(db_path, profile)
+        i = offset
+        while not stop.is_set():
+            db.add_credential(make_credential(i))
+            i += 1
+        db.close()
+        with lock:
+            counts['writes'] = i - offset
+
+    def reader():
+        db = VaultDatabase(db_path, profile)
+        reads = errors = 0
+        while not stop.is_set():
+            try:
+                db.get_credentials_by_category('Finance')
+                reads += 1
+            except Exception:
+                errors += 1
+        db.close()
+        with lock:
+            counts['reads'] += reads
+            counts['errors'] += errors
+
+    threads = [threading.Thread(target=writer)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    return counts['writes'] / duration, counts['reads'] / duration, counts['errors']
+
+
+def bench_pragmas(args):
+    """Compare commit latency and read concurrency: default SQLite vs tuned profile."""
+    print(f"\nVault with {args.count:,} credentials, {args.samples} commits, "
+          f"{args.readers} readers for {args.duration:.0f}s\n")
+    print_row("", "legacy", "tuned")
+
+    results = {}
+    for name, profile in (('legacy', LEGACY_PROFILE), ('tuned', ConnectionProfile())):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = Path(tmp) / "vault.db"
+            db = VaultDatabase(db_path, profile)
+            seed_vault(db, args.count)
+            latencies = _measure_commits(db, args.samples, args.count)
+            db.close()
+            writes, reads, errors = _measure_concurrency(
+                db_path, profile, args.count + args.samples, args.readers, args.duration)
+        results[name] = (mean(latencies), quantiles(latencies, n=20)[-1], writes, reads, errors)
+
+    legacy, tuned = results['legacy'], results['tuned']
+    print_row("commit latency mean (ms)", f"{legacy[0]:.3f}", f"{tuned[0]:.3f}")
+    print_row("commit latency p95 (ms)", f"{legacy[1]:.3f}", f"{tuned[1]:.3f}")
+    print_row("writes/s under read load", f"{legacy[2]:,.0f}", f"{tuned[2]:,.0f}")
+    print_row("reads/s under write load", f"{legacy[3]:,.0f}", f"{tuned[3]:,.0f}")
+    print_row("reader lock errors", legacy[4], tuned[4])
+    print()
+    _check_bulk_update_log()
+
+
+def _check_bulk_update_log():
+    """update_credentials() logs only the rows it changed, like update_credential()."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = VaultDatabase(Path(tmp) / "vault.db")
+        seed_vault(db, 3)
+        credentials = db.get_all_credentials()
+        missing = make_credential(99)
+        missing.id = max(credential.id for credential in credentials) + 1000
+        assert db.update_credentials(credentials + [missing]) == len(credentials)
+        edits = [log.target for log in db.get_activity_logs(100) if log.action == 'EDIT']
+        db.close()
+    assert missing.website not in edits, "logged an edit of a missing credential"
+    assert len(edits) == len(credentials), f"{len(edits)} edit logs for {len(credentials)} updates"
+    print("  bulk update logs only the rows it changed: ok\n")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# check-plans
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Queries that are allowed to scan a whole table, with the reason why
+FULL_SCAN_ALLOWED = {
+    'iter_archived_activity_logs': "reads the whole archive by design",
+    'export_vault': "writes every credential to the backup by design",
+}
+
+# Tables with one row per category; scanning them is cheap by design
+SMALL_TABLES = {'categories', 'category_counts'}
+
+# The LIKE fallback only runs when SQLite has no FTS5
+FTS_FALLBACK_ALLOWED = {
+    'search_credentials': "LIKE fallback, SQLite built without FTS5",
+}
+
+
+
+def _is_full_scan(sql: str, detail: str) -> bool:
+    """Whether a plan step reads a whole table (or sorts it in a temp b-tree)."""
+    if detail.startswith('USE TEMP B-TREE'):
+        return True
+    if not detail.startswith('SCAN') or 'VIRTUAL TABLE' in detail:
+        return False
+    if detail.split()[1] in SMALL_TABLES:
+        return False
+    if detail.split()[1].startswith('(subquery'):
+        return False  # Reads a subquery's output, whose own steps are checked
+    has_where = bool(re.search(r'\bWHERE\b', sql, re.I))
+    has_limit = bool(re.search(r'\bLIMIT\b', sql, re.I))
+    if 'INDEX' not in detail:
+        # A rowid-ordered walk with no filter stops at its LIMIT
+        return has_where or not has_limit
+    # An index-ordered scan is fine when the query reads every row by design
+    # or stops early at a LIMIT; with a filter and no LIMIT it visits them all
+    return has_where and not has_limit
+
+
+def _query_workload(db: VaultDatabase, security: SecurityManager) -> list:
+    """Every query-issuing VaultDatabase call, labelled by method name."""
+    first = db.get_all_credentials()[0]
+    # Decryptable rows, so the export has records for the import to probe
+    start = db.get_credential_count()
+    added = [make_credential(i) for i in range(start, start + 50)]
+    for credential, ciphertext in zip(added, security.encrypt_many(
+            secrets.token_urlsafe(16) for _ in added)):
+        credential.encrypted_password = ciphertext
+    backup = io.BytesIO()
+    return [
+        ('add_credentials', lambda: db.add_credentials(added)),
+        ('update_credentials', lambda: db.update_credentials(added[:10])),
+        ('get_credential', lambda: db.get_credential(first.id)),
+        ('flush_access_log', db.flush_access_log),
+        ('get_all_credentials', db.get_all_credentials),
+        ('iter_credentials', lambda: list(db.iter_credentials(after=(first.website, first.id), limit=20))),
+        ('iter_credentials', lambda: list(db.iter_credentials(before=(first.website, first.id), limit=20))),
+        ('iter_credentials', lambda: list(db.iter_credentials(category='Finance', limit=20))),
+        ('search_credentials', lambda: db.search_credentials('example')),
+        ('update_credential', lambda: db.update_credential(first)),
+        ('get_credential_count', db.get_credential_count),
+        ('get_last_modified_credential', db.get_last_modified_credential),
+        ('get_credentials_by_category', lambda: db.get_credentials_by_category('Finance')),
+        ('get_categories', db.get_categories),
+        ('get_activity_logs', lambda: db.get_activity_logs(50)),
+        ('get_setting', lambda: db.get_setting('theme')),
+        ('set_setting', lambda: db.set_setting('theme', 'cyber_dark')),
+        ('get_credential', lambda: db.get_credential(first.id)),  # buffered, for get_statistics
+        ('get_statistics', db.get_statistics),
+        ('compact_activity_logs', lambda: db.compact_activity_logs(max_rows=100, max_age_days=30)),
+        ('iter_archived_activity_logs', lambda: list(db.iter_archived_activity_logs())),
+        ('convert_legacy_ciphertexts', db.convert_legacy_ciphertexts),
+        ('begin_rekey', lambda: db.begin_rekey('check-plans', 'check-plans')),
+        ('get_rekey_state', db.get_rekey_state),
+        ('get_ciphertext_batch', lambda: db.get_ciphertext_batch(first.id, 500)),
+        ('apply_rekey_batch', lambda: db.apply_rekey_batch([(first.id, first.encrypted_password, None)])),
+        ('finish_rekey', lambda: db.finish_rekey('check-plans')),
+        ('validate_audit_cache', lambda: db.validate_audit_cache('check-plans')),
+        ('get_audit_page', lambda: db.get_audit_page(first.id, 500)),
+        ('save_audit_results', lambda: db.save_audit_results([(first.id, '', 0, 'Weak', '', 0)])),
+        ('get_unfingerprinted_credentials', lambda: db.get_unfingerprinted_credentials(first.id, 500)),
+        ('set_password_fingerprints', lambda: db.set_password_fingerprints([(first.id, bytes(16))])),
+        ('get_sites_using_password', lambda: db.get_sites_using_password(bytes(16), first.id)),
+        ('get_reused_password_groups', db.get_reused_password_groups),
+        ('count_reused_passwords', db.count_reused_passwords),
+        ('export_vault', lambda: db.export_vault(security, "check-plans-password", backup)),
+        ('import_vault', lambda: db.import_vault(security, io.BytesIO(backup.getvalue()),
+                                                 "check-plans-password", on_conflict=db.IMPORT_UPDATE)),
+        ('delete_credential', lambda: db.delete_credential(first.id)),
+    ]
+
+
+def check_plans(args):
+    """Fail if any database query falls back to a full table scan or temp sort."""
+    with tempfile.TemporaryDirectory() as tmp:
+        security = SecurityManager(Path(tmp))
+        security.create_master_password("bench-master-password", params=BENCH_KDF)
+        db = VaultDatabase(Path(tmp) / "vault.db")
+        seed_vault(db, args.count)
+
+        statements = []
+        conn = db._get_connection()
+        conn.set_trace_callback(statements.append)
+
+        allowed = dict(FULL_SCAN_ALLOWED)
+        if not db.fts_enabled:
+            allowed.update(FTS_FALLBACK_ALLOWED)
+
+        failures = 0
+        for label, call in _query_workload(db, security):
+            statements.clear()
+            call()
+            for sql in list(statements):
+                if not sql.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+                    continue
+                plan = db.explain_query_plan(sql)
+                bad = [detail for detail in plan if _is_full_scan(sql, detail)]
+                if bad and label in allowed:
+                    status = f"allowed ({allowed[label]})"
+                elif bad:
+                    status = "FULL SCAN"
+                    failures += 1
+                else:
+                    status = "ok"
+                print(f"  {label:<30} {status}")
+                for detail in plan:
+                    print(f"      {detail}")
+
+        conn.set_trace_callback(None)
+        db.close()
+        security.lock_vault()
+
+    print(f"\n{failures} query plan regression(s)\n")
+    return 1 if failures else 0
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# bench-search
+# ═══════════════════════════════════════════════════════════════════════════════
+
+SEARCH_QUERIES = ['site-00042', 'user77', 'finance', 'recovery 123', 'example', 'zzz']
+
+
+def bench_search(args):
+    """Compare search latency: FTS5 index vs LIKE substring scan."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = VaultDatabase(Path(tmp) / "vault.db")
+        seed_vault(db, args.count)
+        if not db.fts_enabled:
+            print("SQLite was built without FTS5; only the LIKE path is available.")
+
+        print(f"\nSearch latency on {args.count:,} credentials (median of {args.repeat} runs)\n")
+        print_row("query", "matches", "LIKE (ms)", "FTS5 (ms)")
+
+        has_fts = db.fts_enabled
+        for query in SEARCH_QUERIES:
+            timings = {}
+            for mode in ('like', 'fts'):
+                db.fts_enabled = has_fts and mode == 'fts'
+                samples = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    matches = len(db.search_credentials(query))
+                    samples.append((time.perf_counter() - start) * 1000)
+                timings[mode] = (sorted(samples)[len(samples) // 2], matches)
+            print_row(repr(query), timings['fts'][1],
+                      f"{timings['like'][0]:.2f}", f"{timings['fts'][0]:.2f}")
+
+        # Both paths must cover the same columns: "offline" only occurs in notes
+        with_notes = len(range(0, args.count, 3))
+        for mode in ('like', 'fts'):
+            db.fts_enabled = has_fts and mode == 'fts'
+            matches = len(db.search_credentials('offline'))
+            assert matches == with_notes, f"{mode} search found {matches} of {with_notes} notes matches"
+        db.fts_enabled = has_fts
+        print("\n  notes are searched with and without FTS5: ok")
+        db.close()
+    print()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# bench-rows
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class LegacyCredential:
+    """The pre-row-factory record: a regular dataclass with a __dict__."""
+    id: int
+    website: str
+    username: str
+    encrypted_password: str
+    notes: str
+    category: str
+    created_at: str
+    last_updated: str
+    last_accessed: str
+    access_count: int
+
+
+def _legacy_load(db: VaultDatabase) -> list:
+    """The old mapping path: sqlite3.Row key lookups into a dict-backed dataclass."""
+    cursor = db._get_connection().cursor()
+    cursor.execute('SELECT * FROM credentials ORDER BY website ASC')
+    return [LegacyCredential(
+        id=row['id'],
+        website=row['website'],
+        username=row['username'],
+        encrypted_password=row['encrypted_password'],
+        notes=row['notes'],
+        category=row['category'],
+        created_at=row['created_at'],
+        last_updated=row['last_updated'],
+        last_accessed=row['last_accessed'],
+        access_count=row['access_count']
+    ) for row in cursor.fetchall()]
+
+
+def _measure_load(load, count: int, repeat: int) -> tuple:
+    """Return (rows per second, retained bytes per record) for a loader."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    records = load()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return count / best, retained / count
+
+
+def bench_rows(args):
+    """Compare rows/s and bytes/record of the old and new row-mapping paths."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = VaultDatabase(Path(tmp) / "vault.db")
+        seed_vault(db, args.count)
+
+        paths = [
+            ("sqlite3.Row + dataclass", lambda: _legacy_load(db)),
+            ("row factory", db.get_all_credentials),
+            ("row factory, lazy", lambda: db.get_all_credentials(lazy=True)),
+        ]
+
+        print(f"\nMapping {args.count:,} rows (best of {args.repeat})\n")
+        print_row("path", "rows/s", "bytes/record")
+        for label, load in paths:
+            rate, size = _measure_load(load, args.count, args.repeat)
+            print_row(label, f"{rate:,.0f}", f"{size:,.0f}")
+        db.close()
+    print()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# bench-dashboard
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _legacy_dashboard(db: VaultDatabase):
+    """The queries a dashboard render used to run against the credentials table."""
+    cursor = db._get_connection().cursor()
+    cursor.execute('SELECT COUNT(*) FROM credentials')
+    cursor.fetchone()
+    cursor.execute('SELECT COUNT(*) FROM credentials')
+    cursor.fetchone()
+    cursor.execute('SELECT category, COUNT(*) as count FROM credentials GROUP BY category')
+    cursor.fetchall()
+    cursor.execute('SELECT website, username, access_count FROM credentials ORDER BY access_count DESC LIMIT 5')
+    cursor.fetchall()
+    cursor.execute('SELECT website, username, created_at FROM credentials ORDER BY created_at DESC LIMIT 5')
+    cursor.fetchall()
+    db.get_last_modified_credential()
+    db.get_activity_logs(5)
+
+
+def _dashboard(db: VaultDatabase):
+    """The queries DashboardScreen.render runs now."""
+    db.get_statistics()
+    db.get_last_modified_credential()
+    db.get_activity_logs(5)
+
+
+def bench_dashboard(args):
+    """Time the dashboard's data queries: live aggregates vs summary counters."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = VaultDatabase(Path(tmp) / "vault.db")
+        seed_vault(db, args.count)
+
+        print(f"\nDashboard data on {args.count:,} credentials (median of {args.repeat} renders)\n")
+        print_row("path", "ms/render")
+        for label, render in (("aggregate queries", _legacy_dashboard), ("summary counters", _dashboard)):
+            samples = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                render(db)
+                samples.append((time.perf_counter() - start) * 1000)
+            print_row(label, f"{sorted(samples)[len(samples) // 2]:.3f}")
+        db.close()
+    print()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# bench-unlock
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _median_ms(call, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - start) * 1000)
+    return sorted(samples)[len(samples) // 2]
+
+
+def bench_unlock(args):
+    """Calibrate the KDF, then time unlock, export and import of a vault."""
+    password = "bench-master-password"
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+
+        start = time.perf_counter()
+        params = kdf.calibrate(args.kdf, args.target_ms)
+        calibration_ms = (time.perf_counter() - start) * 1000
+
+        security = SecurityManager(tmp)
+        security.create_master_password(password, params=params)
+        db = VaultDatabase(tmp / "vault.db")
+        credentials = []
+        for i in range(args.count):
+            credential = make_credential(i)
+            credential.encrypted_password = security.encrypt(secrets.token_urlsafe(16))
+            credentials.append(credential)
+        db.add_credentials(credentials)
+
+        print(f"\nKDF {params.describe()}, target {args.target_ms} ms "
+              f"(calibrated in {calibration_ms:.0f} ms)")
+        print(f"Vault of {args.count:,} credentials, median of {args.repeat} runs\n")
+        print_row("operation", "ms")
+
+        def unlock():
+            security.lock_vault()
+            assert security.verify_master_password(password)
+
+        def unlock_after_auto_lock():
+            security.lock_vault(wipe_keys=False)
+            assert security.verify_master_password(password)
+
+        def export_cold():
+            security.key_cache.wipe()
+            out = io.BytesIO()
+            db.export_vault(security, "bench-export-password", out)
+            return out.getvalue()
+
+        exported = export_cold()
+
+        def import_fresh(cold: bool):
+            if cold:
+                security.key_cache.wipe()
+            target = VaultDatabase(tmp / f"import-{secrets.token_hex(4)}.db")
+            target.import_vault(security, io.BytesIO(exported), "bench-export-password")
+            target.close()
+
+        print_row("unlock", f"{_median_ms(unlock, args.repeat):.1f}")
+        print_row("unlock after auto-lock", f"{_median_ms(unlock_after_auto_lock, args.repeat):.1f}")
+        print_row("legacy pbkdf2 unlock", f"{_median_ms(lambda: kdf.derive_key(password, bytes(32), kdf.LEGACY_PARAMS), args.repeat):.1f}")
+        print_row("export", f"{_median_ms(export_cold, args.repeat):.1f}")
+        print_row("export (cached key)", f"{_median_ms(lambda: db.export_vault(security, 'bench-export-password', io.BytesIO()), args.repeat):.1f}")
+        print_row("import", f"{_median_ms(lambda: import_fresh(True), args.repeat):.1f}")
+
+        passwords = [password, "bench-other-password"]
+
+        def change_password():
+            assert security.change_master_password(passwords[0], passwords[1])
+            passwords.reverse()
+
+        print_row("change master password", f"{_median_ms(change_password, args.repeat):.1f}")
+        print_row("import (cached key)", f"{_median_ms(lambda: import_fresh(False), args.repeat):.1f}")
+
+        security.lock_vault()
+        db.close()
+    print()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# bench-crypto
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Cheap KDF: this benchmark measures the per-credential cipher path only
+BENCH_KDF = kdf.KDFParams('pbkdf2-sha256', {'iterations': 1000})
+
+
+def bench_crypto(args):
+    """Per-call encrypt/decrypt vs the chunked, thread-pooled bulk APIs."""
+    with tempfile.TemporaryDirectory() as tmp:
+        security = SecurityManager(Path(tmp))
+        security.create_master_password("bench-master-password", params=BENCH_KDF)
+        plaintexts = [secrets.token_urlsafe(16) for _ in range(args.count)]
+        ciphertexts = list(security.encrypt_many(plaintexts))
+
+        def timed(label, call):
+            start = time.perf_counter()
+            result = call()
+            elapsed = time.perf_counter() - start
+            print_row(label, f"{args.count / elapsed:,.0f}", f"{elapsed * 1000:,.0f}")
+            return result
+
+        print(f"\n{args.count:,} credentials, {os.cpu_count()} CPU(s)\n")
+        print_row("path", "items/s", "ms")
+        timed("encrypt (per call)", lambda: [security.encrypt(p) for p in plaintexts])
+        timed("encrypt_many", lambda: list(security.encrypt_many(plaintexts)))
+        assert timed("decrypt (per call)", lambda: [security.decrypt(c) for c in ciphertexts]) == plaintexts
+        for workers in sorted({1, 2, 4, SecurityManager.BULK_WORKERS}):
+            result = timed(f"decrypt_many ({workers} workers)",
+                           lambda: list(security.decrypt_many(ciphertexts, workers=workers)))
+            assert result == plaintexts
+        security.lock_vault()
+    print()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# bench-backup
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _traced(call):
+    """Run `call`; return (seconds, peak traced allocation in bytes)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    call()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def bench_backup(args):
+    """Streaming export/import time and peak memory at growing vault sizes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        security = SecurityManager(tmp)
+        security.create_master_password("bench-master-password", params=BENCH_KDF)
+
+        print()
+        print_row("credentials", "export ms", "export peak KiB", "import ms", "import peak KiB")
+        for count in (args.count // 10, args.count):
+            db = VaultDatabase(tmp / f"vault-{count}.db")
+            credentials = []
+            for i, ciphertext in enumerate(security.encrypt_many(
+                    secrets.token_urlsafe(16) for _ in range(count))):
+                credential = make_credential(i)
+                credential.encrypted_password = ciphertext
+                credentials.append(credential)
+            db.add_credentials(credentials)
+            del credentials
+
+            path = tmp / f"backup-{count}.vault"
+
+            def export():
+                with open(path, 'wb') as out:
+                    assert db.export_vault(security, "bench-export-password", out) == count
+
+            target = VaultDatabase(tmp / f"import-{count}.db")
+
+            def import_():
+                with open(path, 'rb') as source:
+                    assert target.import_vault(security, source, "bench-export-password").inserted == count
+
+            export_s, export_peak = _traced(export)
+            import_s, import_peak = _traced(import_)
+            print_row(f"{count:,}", f"{export_s * 1000:,.0f}", f"{export_peak / 1024:,.0f}",
+                      f"{import_s * 1000:,.0f}", f"{import_peak / 1024:,.0f}")
+            target.close()
+            db.close()
+
+        _check_import_report(tmp, security)
+        _check_backup_salt(tmp, security)
+        security.lock_vault()
+    print()
+
+
+def _check_backup_salt(tmp: Path, security: SecurityManager):
+    """An export under the master password must not reuse the master salt (and so the KEK)."""
+    db = VaultDatabase(tmp / "backup-salt.db")
+    salts = []
+    for _ in range(2):
+        backup = io.BytesIO()
+        db.export_vault(security, "bench-master-password", backup)
+        salts.append(read_header(io.BytesIO(backup.getvalue())).salt)
+    db.close()
+    assert salts[0] != security._read_salt(), "backup keyed with the master salt"
+    assert salts[0] == salts[1], "repeat export missed the backup key cache"
+    print("  export under the master password uses its own salt: ok")
+
+
+def _check_import_report(tmp: Path, security: SecurityManager):
+    """
+    Every record of an export lands in exactly one ImportReport bucket,
+    including duplicates split across chunks and invalid records.
+    """
+    db = VaultDatabase(tmp / "import-report.db")
+    credentials = [make_credential(i) for i in range(50)]
+    for credential, ciphertext in zip(credentials, security.encrypt_many(
+            secrets.token_urlsafe(16) for _ in credentials)):
+        credential.encrypted_password = ciphertext
+    db.add_credentials(credentials)
+
+    # Sites 0-199 (0-49 already in the vault), sites 100-149 again in
+    # later chunks, and records the import must reject
+    sites = list(range(200)) + list(range(100, 150))
+    records = [{'website': f"site-{i:07d}.example.com", 'username': f"user{i}@example.com",
+                'password': secrets.token_urlsafe(16)} for i in sites]
+    records += [{'website': "", 'username': "x", 'password': "x"}] * 5
+    records += [{'website': "no-password.example.com", 'username': "x"}] * 5
+    path = tmp / "import-report.vault"
+    params = security.kdf_params
+    salt, key = security.derive_backup_key("bench-export-password", params)
+    with open(path, 'wb') as out:
+        writer = BackupWriter(out, BackupHeader(params, salt, chunk_size=64), key)
+        for record in records:
+            writer.write(record)
+        writer.close()
+
+    expected = {db.IMPORT_SKIP: (150, 0, 50, 60), db.IMPORT_UPDATE: (0, 200, 0, 60)}
+    for policy, (inserted, updated, skipped, failed) in expected.items():
+        with open(path, 'rb') as source:
+            report = db.import_vault(security, source, "bench-export-password", on_conflict=policy)
+        totals = (report.inserted, report.updated, report.skipped, len(report.failed))
+        assert sum(totals) == len(records), f"{policy}: {report.summary()} for {len(records)} records"
+        assert totals == (inserted, updated, skipped, failed), f"{policy}: {report.summary()}"
+        assert sum(reason == "duplicate in import file" for _, reason in report.failed) == 50
+    assert db.get_credential_count() == 200
+    db.close()
+    print(f"  import report accounts for all {len(records)} records: ok")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# bench-strength
+# ═══════════════════════════════════════════════════════════════════════════════
+
+LEGACY_SYMBOLS = "!@#$%^&*()_+-=[]{}|;:,.<>?"
+
+
+def _legacy_analyze_strength(password: str) -> tuple:
+    """The multi-pass analyzer the single-pass one replaced."""
+    score = 0
+    issues = []
+    length = len(password)
+    if length >= 16:
+        score += 30
+    elif length >= 12:
+        score += 20
+    elif length >= 8:
+        score += 10
+    else:
+        issues.append("Too short (min 8 characters)")
+    has_lower = any(c.islower() for c in password)
+    has_upper = any(c.isupper() for c in password)
+    has_digit = any(c.isdigit() for c in password)
+    has_symbol = any(c in LEGACY_SYMBOLS for c in password)
+    score += sum([has_lower, has_upper, has_digit, has_symbol]) * 15
+    if not has_upper:
+        issues.append("Add uppercase letters")
+    if not has_digit:
+        issues.append("Add numbers")
+    if not has_symbol:
+        issues.append("Add special characters")
+    if any(p in password.lower() for p in ['123', 'abc', 'qwerty', 'password', 'admin']):
+        score -= 20
+        issues.append("Contains common patterns")
+    if any(password.count(c) > 3 for c in set(password)):
+        score -= 10
+        issues.append("Too many repeated characters")
+    score = max(0, min(100, score))
+    rating = ("Excellent" if score >= 80 else "Good" if score >= 60 else "Fair" if score >= 40
+              else "Weak" if score >= 20 else "Critical")
+    return score, rating, issues
+
+
+def _strength_corpus(count: int) -> list:
+    """A mix of generated, human-style and long passwords."""
+    words = ['summer', 'dragon', 'admin', 'qwerty', 'monkey', 'letmein', 'Password', 'abc']
+    corpus = []
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            corpus.append(secrets.token_urlsafe(12))
+        elif kind == 1:
+            corpus.append(f"{secrets.choice(words)}{secrets.randbelow(10000)}!")
+        elif kind == 2:
+            corpus.append(secrets.token_hex(32))
+        else:
+            corpus.append(secrets.choice(words) * 3)
+    return corpus
+
+
+def bench_strength(args):
+    """Multi-pass vs single-pass password analysis, cold and cached."""
+    corpus = _strength_corpus(args.count)
+    analyzer = StrengthAnalyzer(cache_size=args.count)
+
+    def timed(label, call, count=args.count):
+        start = time.perf_counter()
+        result = call()
+        elapsed = time.perf_counter() - start
+        print_row(label, f"{count / elapsed:,.0f}", f"{elapsed * 1000:,.0f}")
+        return result
+
+    print(f"\n{args.count:,} passwords\n")
+    print_row("analyzer", "passwords/s", "ms")
+    expected = timed("multi-pass (legacy)", lambda: [_legacy_analyze_strength(p) for p in corpus])
+    uncached = StrengthAnalyzer(cache_size=0)
+    assert timed("single pass", lambda: [uncached.analyze(p) for p in corpus]) == expected
+    timed("analyze_many (cold cache)", lambda: analyzer.analyze_many(corpus))
+    batch = timed("analyze_many (re-audit)", lambda: analyzer.analyze_many(corpus))
+    assert list(batch.scores) == [score for score, _, _ in expected]
+
+    # Long passphrases with many distinct characters: count() per character is quadratic
+    passphrases = [''.join(chr(0x4e00 + secrets.randbelow(0x5000)) for _ in range(2000))
+                   for _ in range(200)]
+    print()
+    print_row("2000-char passphrases", "passwords/s", "ms")
+    expected = timed("multi-pass (legacy)", lambda: [_legacy_analyze_strength(p) for p in passphrases],
+                     len(passphrases))
+    assert timed("single pass", lambda: [uncached.analyze(p) for p in passphrases],
+                 len(passphrases)) == expected
+    print()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# bench-storage
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _legacy_ciphertext(ciphertext: bytes) -> str:
+    """The pre-binary storage format: base64 text of the Fernet token."""
+    return base64.urlsafe_b64encode(base64.urlsafe_b64encode(ciphertext[1:])).decode()
+
+
+def bench_storage(args):
+    """Bytes per credential and decrypt speed, legacy text vs binary ciphertexts."""
+    with tempfile.TemporaryDirectory() as tmp:
+        security = SecurityManager(Path(tmp))
+        security.create_master_password("bench-master-password", params=BENCH_KDF)
+        plaintexts = [secrets.token_urlsafe(16) for _ in range(args.count)]
+        binary = list(security.encrypt_many(plaintexts))
+        legacy = [_legacy_ciphertext(c) for c in binary]
+
+        db = VaultDatabase(Path(tmp) / "vault.db")
+        credentials = []
+        for i, ciphertext in enumerate(legacy):
+            credential = make_credential(i)
+            credential.encrypted_password = ciphertext
+            credentials.append(credential)
+        db.add_credentials(credentials)
+
+        def column_bytes() -> int:
+            cursor = db._get_connection().cursor()
+            cursor.execute('SELECT SUM(LENGTH(CAST(encrypted_password AS BLOB))) FROM credentials')
+            return cursor.fetchone()[0]
+
+        def file_bytes() -> int:
+            cursor = db._get_connection().cursor()
+            cursor.execute('VACUUM')
+            # In WAL mode VACUUM writes to the -wal file; fold it back into the
+            # main file first, or stat() sees the pre-VACUUM size
+            cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            return db.db_path.stat().st_size
+
+        print(f"\n{args.count:,} credentials\n")
+        print_row("format", "bytes/cred", "vault KiB")
+        print_row("text (legacy)", f"{column_bytes() / args.count:.1f}", f"{file_bytes() / 1024:,.0f}")
+        start = time.perf_counter()
+        converted = db.convert_legacy_ciphertexts()
+        elapsed = time.perf_counter() - start
+        print_row("binary", f"{column_bytes() / args.count:.1f}", f"{file_bytes() / 1024:,.0f}")
+        print(f"\nconverted {converted:,} rows in {elapsed * 1000:,.0f} ms\n")
+
+        print_row("decrypt", "items/s", "ms")
+        for label, ciphertexts in (("text (legacy)", legacy), ("binary", binary)):
+            start = time.perf_counter()
+            assert list(security.decrypt_many(ciphertexts, workers=1)) == plaintexts
+            elapsed = time.perf_counter() - start
+            print_row(label, f"{args.count / elapsed:,.0f}", f"{elapsed * 1000:,.0f}")
+        db.close()
+        security.lock_vault()
+    print()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# build-breach-index / bench-breach
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def build_breach_index(args):
+    """Build the offline breached-password index from word lists or HIBP SHA-1 files."""
+    output = Path(args.output) if args.output else Path.home() / ".vault_os" / breach.INDEX_FILENAME
+    output.parent.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    count = breach.build_index(
+        args.sources, output,
+        progress=lambda lines: print(f"  {lines:,} lines read", end="\r", flush=True),
+    )
+    elapsed = time.perf_counter() - start
+    print(f"\n{count:,} distinct entries, {output.stat().st_size / 2 ** 20:,.1f} MiB, "
+          f"built in {elapsed:,.1f} s -> {output}")
+
+
+def _rss_kib() -> tuple:
+    """(private, file-backed) resident KiB on Linux; (0, 0) where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as statm:
+            resident, shared = (int(v) for v in statm.read().split()[1:3])
+    except (OSError, ValueError):
+        return 0, 0
+    page_kib = os.sysconf('SC_PAGE_SIZE') // 1024
+    return (resident - shared) * page_kib, shared * page_kib
+
+
+def bench_breach(args):
+    """Index build time, lookup rate and resident memory for a large breach list."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        source = tmp / "breached.txt"
+        with open(source, "w") as out:
+            for i in range(args.count):
+                out.write(f"breached-{i}\n")
+
+        start = time.perf_counter()
+        count = breach.build_index([source], tmp / breach.INDEX_FILENAME)
+        build_s = time.perf_counter() - start
+
+        lookups = 100_000
+        probes = [f"breached-{secrets.randbelow(args.count)}" if i % 2 else secrets.token_urlsafe(12)
+                  for i in range(lookups)]
+        rss_before = _rss_kib()
+        with breach.BreachIndex(tmp / breach.INDEX_FILENAME) as index:
+            # A typical audit: a thousand credentials
+            index.contains_many(probes[:1000])
+            rss_audit = _rss_kib()
+            start = time.perf_counter()
+            hits = sum(index.contains_many(probes))
+            lookup_s = time.perf_counter() - start
+            rss_after = _rss_kib()
+
+        print(f"\n{count:,} entries, index {(tmp / breach.INDEX_FILENAME).stat().st_size / 2 ** 20:,.1f} MiB\n")
+        print_row("build", f"{build_s * 1000:,.0f} ms")
+        print_row("lookups/s", f"{lookups / lookup_s:,.0f}")
+        print_row("hits", f"{hits:,} / {lookups:,}")
+        print()
+        print_row("resident memory growth", "private KiB", "page cache KiB")
+        for label, rss in (("after 1k lookups", rss_audit), (f"after {lookups // 1000}k lookups", rss_after)):
+            print_row(label, f"+{rss[0] - rss_before[0]:,}", f"+{rss[1] - rss_before[1]:,}")
+        assert hits == lookups // 2
+    print()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# bench-audit
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _legacy_audit(db: VaultDatabase, security: SecurityManager):
+    """The pre-pipeline audit: load every credential, decrypt and score them all at once."""
+    credentials = db.get_all_credentials()
+    passwords = list(security.decrypt_many(c.encrypted_password for c in credentials))
+    strength = PasswordGenerator.analyze_many(passwords)
+    return [(c.website, strength.scores[i]) for i, c in enumerate(credentials) if strength.scores[i] < 40]
+
+
+def bench_audit(args):
+    """Audit throughput (credentials/s) and peak memory at growing vault sizes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        security = SecurityManager(Path(tmp))
+        security.create_master_password("bench-master-password", params=BENCH_KDF)
+
+        print()
+        print_row("credentials", "audit", "creds/s", "ms", "peak KiB")
+        for count in (args.count // 10, args.count):
+            db = VaultDatabase(Path(tmp) / f"vault-{count}.db")
+            plaintexts = _strength_corpus(count)
+            db.add_credentials(
+                Credential(None, f"site-{i}.example", f"user{i}", ciphertext, "", "General", "", "", None, 0,
+                           security.fingerprint(password))
+                for i, (password, ciphertext) in enumerate(zip(plaintexts, security.encrypt_many(plaintexts)))
+            )
+            auditor = VaultAuditor(db, security)
+            reports = []
+
+            def timed(label, call):
+                elapsed, peak = _traced(lambda: reports.append(call()))
+                print_row(f"{count:,}", label, f"{count / elapsed:,.0f}", f"{elapsed * 1000:,.0f}",
+                          f"{peak / 1024:,.0f}")
+
+            timed("load all (legacy)", lambda: _legacy_audit(db, security))
+            timed("pipeline, first run", auditor.run)
+            timed("pipeline, unchanged", auditor.run)
+
+            edited = db.get_all_credentials()[::100]
+            passwords = [secrets.token_urlsafe(16) for _ in edited]
+            for credential, password, ciphertext in zip(edited, passwords, security.encrypt_many(passwords)):
+                credential.encrypted_password = ciphertext
+                credential.password_fingerprint = security.fingerprint(password)
+            db.update_credentials(edited)
+            timed(f"pipeline, {len(edited):,} edited", auditor.run)
+
+            first, unchanged, after_edit = reports[1:]
+            assert first.analysed == count and unchanged.analysed == 0 and after_edit.analysed == len(edited)
+            assert first.weak_count == len(reports[0]) and first.complete
+            db.close()
+            print()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# stress-autolock
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def stress_autolock(args):
+    """Fail if per-call encrypt/decrypt grows the thread count (auto-lock timers)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        security = SecurityManager(Path(tmp))
+        security.create_master_password("bench-master-password", params=BENCH_KDF)
+        baseline = threading.active_count()  # main thread + lock watchdog
+
+        peak = baseline
+        done = threading.Event()
+
+        def sample():
+            nonlocal peak
+            while not done.is_set():
+                peak = max(peak, threading.active_count() - 1)  # minus the sampler
+                time.sleep(0.001)
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        start = time.perf_counter()
+        ciphertexts = [security.encrypt(secrets.token_urlsafe(16)) for _ in range(args.count)]
+        for ciphertext in ciphertexts:
+            security.decrypt(ciphertext)
+        elapsed = time.perf_counter() - start
+        done.set()
+        sampler.join()
+        after = threading.active_count()
+        security.lock_vault()
+
+    print(f"\n{args.count:,} encrypt + {args.count:,} decrypt calls in {elapsed * 1000:,.0f} ms\n")
+    print_row("threads before", baseline)
+    print_row("threads at peak", peak)
+    print_row("threads after", after)
+    grew = peak > baseline or after > baseline
+    print(f"\n{'FAIL: thread count grew under load' if grew else 'ok: thread count constant'}\n")
+    return 1 if grew else 0
+
+
+def stress_lock_callback(args):
+    """Fail if a blocked auto-lock callback keeps derived keys cached past their TTL."""
+    with tempfile.TemporaryDirectory() as tmp:
+        security = SecurityManager(Path(tmp))
+        security.create_master_password("bench-master-password", params=BENCH_KDF)
+        security.lock_vault()
+        security.verify_master_password("bench-master-password")  # caches the derived key
+
+        # Below the 60 s minimum of set_lock_timeout, to keep the run short
+        security._lock_timeout = args.ttl
+        security.key_cache.ttl = args.ttl
+
+        called = threading.Event()
+        release = threading.Event()
+
+        def blocked_callback():
+            # Stands in for the unlock prompt, which waits for the user
+            called.set()
+            release.wait()
+
+        security.set_lock_callback(blocked_callback)
+        security.refresh_activity()
+        start = time.perf_counter()
+        fired = called.wait(args.ttl + 5)
+        cached_at_lock = len(security.key_cache)
+
+        time.sleep(args.ttl + 0.5)
+        # Raw count: len() would expire the entries itself and hide a missed purge
+        cached_after_ttl = len(security.key_cache._entries)
+        elapsed = time.perf_counter() - start
+        release.set()
+
+    print(f"\nauto-lock after {args.ttl:g} s, callback left blocked\n")
+    print_row("callback ran", "yes" if fired else "no")
+    print_row("cached keys at lock", cached_at_lock)
+    print_row(f"cached keys after {elapsed:.1f} s", cached_after_ttl)
+    failed = not fired or cached_at_lock == 0 or cached_after_ttl != 0
+    print(f"\n{'FAIL: key cache not purged while the callback blocked' if failed else 'ok: key cache purged on time'}\n")
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vault OS benchmarks and maintenance tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    pragmas = commands.add_parser("bench-pragmas", help=bench_pragmas.__doc__)
+    pragmas.add_argument("--count", type=int, default=10000)
+    pragmas.add_argument("--samples", type=int, default=200)
+    pragmas.add_argument("--readers", type=int, default=4)
+    pragmas.add_argument("--duration", type=float, default=3.0)
+    pragmas.set_defaults(func=bench_pragmas)
+
+    plans = commands.add_parser("check-plans", help=check_plans.__doc__)
+    plans.add_argument("--count", type=int, default=5000)
+    plans.set_defaults(func=check_plans)
+
+    search = commands.add_parser("bench-search", help=bench_search.__doc__)
+    search.add_argument("--count", type=int, default=100000)
+    search.add_argument("--repeat", type=int, default=5)
+    search.set_defaults(func=bench_search)
+
+    rows = commands.add_parser("bench-rows", help=bench_rows.__doc__)
+    rows.add_argument("--count", type=int, default=50000)
+    rows.add_argument("--repeat", type=int, default=3)
+    rows.set_defaults(func=bench_rows)
+
+    dashboard = commands.add_parser("bench-dashboard", help=bench_dashboard.__doc__)
+    dashboard.add_argument("--count", type=int, default=100000)
+    dashboard.add_argument("--repeat", type=int, default=20)
+    dashboard.set_defaults(func=bench_dashboard)
+
+    unlock = commands.add_parser("bench-unlock", help=bench_unlock.__doc__)
+    unlock.add_argument("--count", type=int, default=1000)
+    unlock.add_argument("--repeat", type=int, default=5)
+    unlock.add_argument("--target-ms", type=int, default=kdf.DEFAULT_TARGET_MS)
+    unlock.add_argument("--kdf", choices=list(kdf.BACKENDS), default=None)
+    unlock.set_defaults(func=bench_unlock)
+
+    crypto = commands.add_parser("bench-crypto", help=bench_crypto.__doc__)
+    crypto.add_argument("--count", type=int, default=50000)
+    crypto.set_defaults(func=bench_crypto)
+
+    storage = commands.add_parser("bench-storage", help=bench_storage.__doc__)
+    storage.add_argument("--count", type=int, default=20000)
+    storage.set_defaults(func=bench_storage)
+
+    backup = commands.add_parser("bench-backup", help=bench_backup.__doc__)
+    backup.add_argument("--count", type=int, default=20000)
+    backup.set_defaults(func=bench_backup)
+
+    strength = commands.add_parser("bench-strength", help=bench_strength.__doc__)
+    strength.add_argument("--count", type=int, default=100000)
+    strength.set_defaults(func=bench_strength)
+
+    build_breach = commands.add_parser("build-breach-index", help=build_breach_index.__doc__)
+    build_breach.add_argument("sources", nargs="+", help="word list (one per line) or HIBP HASH:COUNT file")
+    build_breach.add_argument("--output", help="index path (default ~/.vault_os/breached.idx)")
+    build_breach.set_defaults(func=build_breach_index)
+
+    bench_breached = commands.add_parser("bench-breach", help=bench_breach.__doc__)
+    bench_breached.add_argument("--count", type=int, default=2000000)
+    bench_breached.set_defaults(func=bench_breach)
+
+    audit = commands.add_parser("bench-audit", help=bench_audit.__doc__)
+    audit.add_argument("--count", type=int, default=50000)
+    audit.set_defaults(func=bench_audit)
+
+    autolock = commands.add_parser("stress-autolock", help=stress_autolock.__doc__)
+    autolock.add_argument("--count", type=int, default=10000)
+    autolock.set_defaults(func=stress_autolock)
+
+    lock_callback = commands.add_parser("stress-lock-callback", help=stress_lock_callback.__doc__)
+    lock_callback.add_argument("--ttl", type=float, default=0.5)
+    lock_callback.set_defaults(func=stress_lock_callback)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())